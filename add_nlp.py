@@ -1,25 +1,40 @@
 import pandas as pd
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-import re
+import nlp_resources
+import snapshots
+from profiling import timed, span, print_report
 
-# Download VADER lexicon
-nltk.download("vader_lexicon")
+DATA_PATH = "outputs/scored_segmented_products.csv"
 
-# Load the existing data
-df = pd.read_csv("outputs/scored_segmented_products.csv")
+_sia = None
+
+
+def get_analyzer():
+    # Initialize sentiment analyzer once (nltk is imported here, not at module load)
+    global _sia
+    if _sia is None:
+        nlp_resources.use_vendor_dir()
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        _sia = SentimentIntensityAnalyzer()
+    return _sia
 
-# Initialize sentiment analyzer
-sia = SentimentIntensityAnalyzer()
 
 def get_sentiment(text):
     if pd.isna(text):
         return 0
     text = str(text)
-    return sia.polarity_scores(text)["compound"]
+    return get_analyzer().polarity_scores(text)["compound"]
+
+
+def sentiment_scores(reviews):
+    return reviews.apply(get_sentiment).rename("sentiment_score")
+
+
+@timed()
+def add_sentiment(df):
+    # Add sentiment score
+    df["sentiment_score"] = sentiment_scores(df["review_content"])
+    return df
 
-# Add sentiment score
-df["sentiment_score"] = df["review_content"].apply(get_sentiment)
 
 # Risk keyword flags
 risk_words = [
@@ -27,22 +42,56 @@ risk_words = [
     "defective", "fraud", "worst", "return", "refund"
 ]
 
-def risk_flag(text):
-    if pd.isna(text):
-        return 0
-    text = str(text).lower()
-    for w in risk_words:
-        if re.search(rf"\b{w}\b", text):
-            return 1
-    return 0
-
-# Add risk flag
-df["risk_flag"] = df["review_content"].apply(risk_flag)
-
-# Save back to CSV
-df.to_csv("outputs/scored_segmented_products.csv", index=False)
-
-print("NLP columns added successfully!")
-print(f"Total products: {len(df)}")
-print(f"Risk flagged products: {int(df['risk_flag'].sum())}")
-print(f"Average sentiment: {df['sentiment_score'].mean():.3f}")
+
+def keyword_hits(reviews):
+    # one 0/1 column per risk word (case-insensitive, whole word), one vectorized pass per word
+    text = reviews.astype("string")
+    return pd.DataFrame({
+        w: text.str.contains(rf"\b{w}\b", case=False, regex=True).fillna(False).to_numpy(dtype="int8")
+        for w in risk_words
+    }, index=reviews.index)
+
+
+def flags_from_hits(hits):
+    return hits.any(axis=1).astype(int).rename("risk_flag")
+
+
+def risk_flags(reviews):
+    return flags_from_hits(keyword_hits(reviews))
+
+
+@timed()
+def add_risk_flags(df):
+    # Add risk flag
+    df["risk_flag"] = risk_flags(df["review_content"])
+    return df
+
+
+STAGES = [add_sentiment, add_risk_flags]
+
+
+def main():
+    # VADER lexicon must be installed locally (see nlp_resources.py)
+    nlp_resources.ensure(["vader_lexicon"])
+
+    # Load the existing data
+    with span("load"):
+        df = pd.read_csv(DATA_PATH)
+
+    for stage in STAGES:
+        df = stage(df)
+
+    # Save back to CSV (replaced, not rewritten in place) and publish it
+    with span("save"):
+        snapshots.replace_csv(df, DATA_PATH)
+        version = snapshots.publish(snapshots.product_files(DATA_PATH, df.columns))
+
+    print(f"NLP columns added successfully! (snapshot {version})")
+    print(f"Total products: {len(df)}")
+    print(f"Risk flagged products: {int(df['risk_flag'].sum())}")
+    print(f"Average sentiment: {df['sentiment_score'].mean():.3f}")
+    print_report()
+
+
+if __name__ == "__main__":
+    main()
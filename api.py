@@ -0,0 +1,264 @@
+import json
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import List, Literal, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+
+import live_data
+from intelligence import (
+    compare_winner,
+    dataset_version,
+    deal_badges,
+    filter_products,
+    load_products,
+    overall_score,
+    rank_products,
+    recommend,
+    simulate_deal,
+)
+
+# Run with:  uvicorn api:app --port 8000
+# Each worker serves the current published snapshot (live_data.py), or the
+# file named by DATA_PATH. When a new version shows up the frame is swapped
+# and the handler caches are cleared; cached answers are also keyed on the
+# version they were computed from. Until a dataset exists, requests get a 503.
+
+RESULT_COLS = [
+    "product_id", "product_name", "main_category", "segment_name",
+    "discounted_price", "actual_price", "discount_percentage",
+    "rating", "rating_count",
+    "value_score", "trust_score", "popularity_score",
+    "sentiment_score", "risk_flag", "deal_badge",
+]
+
+CACHE_SIZE = int(os.environ.get("API_CACHE_SIZE", "1024"))
+
+log = logging.getLogger("uvicorn.error")
+
+_state = {"data": None}
+_lock = threading.Lock()
+
+
+class Served:
+    # the frame being served, hashed and compared by its version only, so the
+    # handler caches key on the version the frame they were given belongs to
+    __slots__ = ("df", "version")
+
+    def __init__(self, df, version):
+        self.df, self.version = df, version
+
+    def __hash__(self):
+        return hash(self.version)
+
+    def __eq__(self, other):
+        return isinstance(other, Served) and self.version == other.version
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # load the dataset once per worker, before the first request; without one
+    # the app still starts and answers 503 until a snapshot is published
+    try:
+        get_data()
+    except HTTPException as e:
+        log.warning("No dataset loaded at startup: %s", e.detail)
+    yield
+
+
+app = FastAPI(title="Amazon Product Intelligence API", lifespan=lifespan)
+
+
+# ---------- Dataset ----------
+def get_data():
+    # Served frame of the current version, reloaded when a new version is published;
+    # read once per request and passed to the handlers
+    path = os.environ.get("DATA_PATH")
+    if path:
+        data, version = None, dataset_version(path)
+    else:
+        data = live_data.DATASET.current()
+        version = data.version
+    with _lock:
+        served = _state["data"]
+        if served is None or version != served.version:
+            df = load_products(path) if path else data.df
+            if df is None:
+                raise HTTPException(status_code=503, detail="Dataset not found. Run generate_data.py first.")
+            # the live frame is shared, so the badges go on a copy
+            served = Served(df.assign(deal_badge=deal_badges(df)), version)
+            _state["data"] = served
+            for fn in HANDLERS.values():
+                fn.cache_clear()
+        return served
+
+
+def to_records(df, limit=None):
+    cols = [c for c in RESULT_COLS if c in df.columns]
+    if limit is not None:
+        df = df.head(limit)
+    return json.loads(df[cols].to_json(orient="records"))
+
+
+def lookup(df, product_name):
+    rows = df[df["product_name"] == product_name]
+    if len(rows) == 0:
+        raise HTTPException(status_code=404, detail=f"Unknown product: {product_name}")
+    return rows.iloc[0]
+
+
+# ---------- Request models ----------
+class FilterQuery(BaseModel):
+    search_query: str = ""
+    category: str = "All"
+    segment: str = "All"
+    price_range: Optional[Tuple[float, float]] = None
+    discount_range: Optional[Tuple[float, float]] = None
+    rating_range: Optional[Tuple[float, float]] = None
+    only_risky: bool = False
+    limit: int = Field(500, ge=0, le=5000)
+
+
+class RecommendQuery(BaseModel):
+    category: str = "All"
+    max_budget: Optional[float] = None
+    min_rating: float = 3.5
+    preference: Literal["Best overall", "Best value (discount)", "Most trusted", "Most popular"] = "Best overall"
+    top_n: int = Field(15, ge=1, le=50)
+
+
+class CompareQuery(BaseModel):
+    product_a: str
+    product_b: str
+
+
+class SimulateQuery(BaseModel):
+    product_name: str
+    new_actual: float = Field(..., gt=0)
+    new_discounted: float = Field(..., gt=0)
+
+
+# ---------- Cached handlers ----------
+# Responses are cached on the normalized JSON of the query and the version of
+# the frame passed in, so identical requests (including the ones inside a
+# batch) skip the pandas work until a new snapshot is published.
+@lru_cache(maxsize=CACHE_SIZE)
+def _filter(key, data):
+    q = FilterQuery.model_validate_json(key)
+    filtered = filter_products(
+        data.df,
+        search_query=q.search_query,
+        category=q.category,
+        segment=q.segment,
+        price_range=q.price_range,
+        discount_range=q.discount_range,
+        rating_range=q.rating_range,
+        only_risky=q.only_risky,
+    )
+    return {"count": int(len(filtered)), "products": to_records(rank_products(filtered), q.limit)}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _recommend(key, data):
+    q = RecommendQuery.model_validate_json(key)
+    recs = recommend(
+        data.df,
+        category=q.category,
+        max_budget=q.max_budget,
+        min_rating=q.min_rating,
+        preference=q.preference,
+        top_n=q.top_n,
+    )
+    products = to_records(recs)
+    for p, score in zip(products, recs.get("final_score", [])):
+        p["final_score"] = float(score)
+    return {"count": len(products), "products": products}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _compare(key, data):
+    q = CompareQuery.model_validate_json(key)
+    df = data.df
+    row_a, row_b = lookup(df, q.product_a), lookup(df, q.product_b)
+    winner = compare_winner(row_a, row_b)
+    return {
+        "score_a": float(overall_score(row_a)),
+        "score_b": float(overall_score(row_b)),
+        "winner": {"A": q.product_a, "B": q.product_b}.get(winner),
+    }
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _simulate(key, data):
+    q = SimulateQuery.model_validate_json(key)
+    df = data.df
+    row = lookup(df, q.product_name)
+    result = simulate_deal(df, row, q.new_actual, q.new_discounted)
+    result["old_value_score"] = float(row["value_score"])
+    return result
+
+
+# ---------- Endpoints ----------
+@app.get("/health")
+def health():
+    try:
+        data = get_data()
+    except HTTPException:
+        return {"status": "no data", "products": 0, "cache": cache_info()}
+    return {"status": "ok", "version": data.version, "products": int(len(data.df)), "cache": cache_info()}
+
+
+@app.get("/cache")
+def cache_info():
+    return {name: fn.cache_info()._asdict() for name, fn in HANDLERS.items()}
+
+
+@app.post("/filter")
+def filter_endpoint(q: FilterQuery):
+    return _filter(q.model_dump_json(), get_data())
+
+
+@app.post("/recommend")
+def recommend_endpoint(q: RecommendQuery):
+    return _recommend(q.model_dump_json(), get_data())
+
+
+@app.post("/compare")
+def compare_endpoint(q: CompareQuery):
+    return _compare(q.model_dump_json(), get_data())
+
+
+@app.post("/simulate")
+def simulate_endpoint(q: SimulateQuery):
+    return _simulate(q.model_dump_json(), get_data())
+
+
+@app.post("/batch/filter")
+def batch_filter(queries: List[FilterQuery]):
+    data = get_data()
+    return [_filter(q.model_dump_json(), data) for q in queries]
+
+
+@app.post("/batch/recommend")
+def batch_recommend(queries: List[RecommendQuery]):
+    data = get_data()
+    return [_recommend(q.model_dump_json(), data) for q in queries]
+
+
+@app.post("/batch/compare")
+def batch_compare(queries: List[CompareQuery]):
+    data = get_data()
+    return [_compare(q.model_dump_json(), data) for q in queries]
+
+
+@app.post("/batch/simulate")
+def batch_simulate(queries: List[SimulateQuery]):
+    data = get_data()
+    return [_simulate(q.model_dump_json(), data) for q in queries]
+
+
+HANDLERS = {"filter": _filter, "recommend": _recommend, "compare": _compare, "simulate": _simulate}
@@ -1,6 +1,5 @@
 import streamlit as st
-import pandas as pd
-import os
+from utils import load_data
 
 st.set_page_config(
     page_title="Amazon Product Intelligence Dashboard",
@@ -23,13 +22,11 @@ st.markdown("""
 st.info("Use the left sidebar to navigate pages: Product Explorer, Product Details, Category Intelligence, Insights.")
 
 # Quick data check
-file_path = "outputs/scored_segmented_products.csv"
-if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+df = load_data().df
+if df is None:
     st.error("❌ outputs/scored_segmented_products.csv is missing or empty. Run the notebook and export it.")
     st.stop()
 
-df = pd.read_csv(file_path)
-
 col1, col2, col3, col4 = st.columns(4)
 col1.metric("Total Products", f"{len(df):,}")
 col2.metric("Avg Rating", f"{df['rating'].mean():.2f}")
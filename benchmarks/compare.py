@@ -0,0 +1,70 @@
+import argparse
+import json
+import sys
+
+# Diff two benchmark reports written by benchmarks/run.py
+#
+#   python -m benchmarks.compare baseline.json bench.json --threshold 1.2
+#
+# Exits with status 1 when any step got slower (or used more memory) than
+# the threshold ratio, so it can gate a CI job.
+
+
+def flatten(report):
+    rows = {}
+    for size, groups in report["results"].items():
+        for group, entries in groups.items():
+            for name, rec in entries.items():
+                rows[(size, group, name)] = rec
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio that counts as a regression")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="ignore steps faster than this")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        base = json.load(f)
+    with open(args.candidate) as f:
+        cand = json.load(f)
+
+    print(f"baseline  {base['meta'].get('commit')}  vs  candidate  {cand['meta'].get('commit')}")
+    print(f"{'size':>10} {'step':<30} {'base s':>10} {'new s':>10} {'ratio':>7} {'base MB':>9} {'new MB':>9}")
+
+    regressions = []
+    base_rows, cand_rows = flatten(base), flatten(cand)
+    for key in sorted(set(base_rows) & set(cand_rows), key=lambda k: (int(k[0]), k[1], k[2])):
+        b, c = base_rows[key], cand_rows[key]
+        ratio = c["seconds"] / b["seconds"] if b["seconds"] > 0 else float("inf")
+        mem_ratio = c.get("peak_mb", 0) / b["peak_mb"] if b.get("peak_mb") else 1.0
+
+        flag = ""
+        if max(b["seconds"], c["seconds"]) >= args.min_seconds and ratio > args.threshold:
+            flag = "  << slower"
+            regressions.append(key)
+        elif mem_ratio > args.threshold:
+            flag = "  << more memory"
+            regressions.append(key)
+
+        size, group, name = key
+        print(
+            f"{int(size):>10,} {group + '.' + name:<30} {b['seconds']:>10.4f} {c['seconds']:>10.4f} "
+            f"{ratio:>7.2f} {b.get('peak_mb', float('nan')):>9.1f} {c.get('peak_mb', float('nan')):>9.1f}{flag}"
+        )
+
+    for key in sorted(set(base_rows) ^ set(cand_rows)):
+        where = "baseline" if key in base_rows else "candidate"
+        print(f"  only in {where}: {key[0]} {key[1]}.{key[2]}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.2f}x")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import json
+from itertools import combinations
+
+import dedup
+from benchmarks.run import measure, parse_size
+from benchmarks.synthetic import generate_catalog
+
+# Scaling of the MinHash / LSH near-duplicate stage (dedup.py).
+#
+#   python -m benchmarks.dedup_bench --sizes 10k,100k,1M,3M
+#
+# For each size the synthetic catalog's product names are grouped and the
+# time, peak memory and ns per name are reported; flat ns per name means the
+# stage scales linearly. --check-sample names are also compared against an
+# exact all-pairs Jaccard pass (see check_quality).
+
+
+def exact_jaccard(names):
+    # {(i, j): exact shingle Jaccard} over all pairs of distinct same-brand names (quadratic)
+    norm = dedup.normalize_names(names).str.pad(dedup.SHINGLE, side="right").tolist()
+    shingles = [{s[i:i + dedup.SHINGLE] for i in range(len(s) - dedup.SHINGLE + 1)} for s in norm]
+    brands = [s.split(" ", 1)[0] for s in norm]
+    return {
+        (i, j): len(shingles[i] & shingles[j]) / len(shingles[i] | shingles[j])
+        for i, j in combinations(range(len(norm)), 2)
+        if brands[i] == brands[j] and norm[i] != norm[j]
+    }
+
+
+def check_quality(names, threshold=dedup.THRESHOLD):
+    # recall: share of the pairs at or above the threshold that end up in one group.
+    # Groups are connected components, so two members can be linked through a
+    # third and sit below the threshold themselves; min_jaccard shows how far.
+    names = names.reset_index(drop=True)
+    groups = dedup.listing_groups(names, threshold=threshold).to_numpy()
+    jaccard = exact_jaccard(names)
+    similar = [pair for pair, j in jaccard.items() if j >= threshold]
+    grouped = [j for (a, b), j in jaccard.items() if groups[a] == groups[b]]
+    return {
+        "names": len(names),
+        "similar_pairs": len(similar),
+        "recall": round(sum(groups[a] == groups[b] for a, b in similar) / len(similar), 4) if similar else None,
+        "grouped_pairs": len(grouped),
+        "min_jaccard": round(min(grouped), 4) if grouped else None,
+    }
+
+
+def bench_size(n, seed, trace_memory):
+    names = generate_catalog(n, seed=seed, reviews_per_product=1, malformed_rate=0)["product_name"]
+    groups, record = measure(dedup.listing_groups, names, trace_memory=trace_memory)
+    sizes = groups.value_counts()
+    record.update({
+        "names": n,
+        "distinct_names": int(names.nunique()),
+        "groups": int(len(sizes)),
+        "largest_group": int(sizes.max()),
+        "listings_in_groups": int(sizes[sizes > 1].sum()),
+        "ns_per_name": round(record["seconds"] / n * 1e9),
+    })
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate listing detection")
+    parser.add_argument("--sizes", default="10k,100k,1M", help="comma separated, e.g. 10k,100k,1M,3M")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--check-sample", type=int, default=2000, help="names checked against exact all-pairs (0 to skip)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak-memory runs")
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    report = {"sizes": {}}
+    for size in [parse_size(s) for s in args.sizes.split(",")]:
+        rec = bench_size(size, args.seed, not args.no_memory)
+        report["sizes"][str(size)] = rec
+        print(
+            f"{size:>10,} names  {rec['seconds']:>8.2f} s  {rec['ns_per_name']:>6,} ns/name"
+            + (f"  {rec['peak_mb']:>8.1f} MB" if "peak_mb" in rec else "")
+            + f"  {rec['groups']:>9,} groups  ({rec['listings_in_groups']:,} listings in multi-listing groups,"
+            f" largest {rec['largest_group']})"
+        )
+
+    if args.check_sample:
+        # a small catalog, so every base product has several listings in the sample
+        names = generate_catalog(args.check_sample, seed=args.seed, reviews_per_product=1, malformed_rate=0)["product_name"]
+        report["quality"] = check_quality(names)
+        q = report["quality"]
+        print(
+            f"vs exact all-pairs on {q['names']:,} names: {q['similar_pairs']:,} pairs with Jaccard >= "
+            f"{dedup.THRESHOLD}, recall {q['recall']}; {q['grouped_pairs']:,} grouped pairs, min Jaccard {q['min_jaccard']}"
+        )
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
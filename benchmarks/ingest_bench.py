@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import ingest
+from benchmarks.run import parse_size
+from benchmarks.synthetic import write_catalog
+
+# Raw-data ingestion: the previous generate_data.py path (pd.read_csv plus a
+# per-element clean_price and .astype(str).str.replace chains) versus
+# ingest.read_raw (pyarrow CSV reader + vectorized parse) versus reading the
+# typed Parquet file that ingest.py writes.
+#
+#   python -m benchmarks.ingest_bench --rows 2M
+#   python -m benchmarks.ingest_bench --csv data/amazon.csv
+
+
+def clean_price(x):
+    if pd.isna(x):
+        return np.nan
+    x = str(x).replace("₹", "").replace(",", "").strip()
+    return pd.to_numeric(x, errors="coerce")
+
+
+def legacy_read(path):
+    df = pd.read_csv(path)
+    df["actual_price"] = df["actual_price"].apply(clean_price)
+    df["discounted_price"] = df["discounted_price"].apply(clean_price)
+    df["discount_percentage"] = df["discount_percentage"].astype(str).str.replace("%", "").str.strip()
+    df["discount_percentage"] = pd.to_numeric(df["discount_percentage"], errors="coerce")
+    df["rating"] = pd.to_numeric(df["rating"], errors="coerce")
+    df["rating_count"] = df["rating_count"].astype(str).str.replace(",", "").str.strip()
+    df["rating_count"] = pd.to_numeric(df["rating_count"], errors="coerce")
+    return df
+
+
+def timed_run(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, round(time.perf_counter() - t0, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark raw CSV ingestion")
+    parser.add_argument("--rows", default="2M", help="synthetic rows, e.g. 500k, 2M")
+    parser.add_argument("--csv", help="benchmark an existing raw CSV instead of a synthetic one")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = args.csv
+        if csv_path is None:
+            csv_path = os.path.join(tmp, "amazon.csv")
+            write_catalog(csv_path, parse_size(args.rows), seed=args.seed)
+        parquet_path = os.path.join(tmp, "amazon.parquet")
+
+        legacy, t_legacy = timed_run(legacy_read, csv_path)
+        (fast, report), t_fast = timed_run(ingest.read_raw, csv_path)
+        _, t_ingest = timed_run(ingest.ingest, csv_path, parquet_path)
+        typed, t_typed = timed_run(pd.read_parquet, parquet_path)
+
+        # the fast path must agree with the old one value for value
+        for col in ingest.NUMERIC_COLUMNS:
+            np.testing.assert_allclose(
+                legacy[col].to_numpy(dtype=float), fast[col].to_numpy(dtype=float), equal_nan=True
+            )
+            np.testing.assert_allclose(
+                legacy[col].to_numpy(dtype=float), typed[col].to_numpy(dtype=float), equal_nan=True
+            )
+
+        result = {
+            "rows": len(legacy),
+            "csv_mb": round(os.path.getsize(csv_path) / 1e6, 1),
+            "parquet_mb": round(os.path.getsize(parquet_path) / 1e6, 1),
+            "legacy_read_clean_s": t_legacy,
+            "ingest_read_raw_s": t_fast,
+            "ingest_to_parquet_s": t_ingest,
+            "read_typed_parquet_s": t_typed,
+            "speedup_vs_legacy": round(t_legacy / t_fast, 1),
+            "validation": report["columns"],
+        }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import numpy as np
+
+# Load-test harness for api.py
+#   uvicorn api:app --port 8000
+#   python -m benchmarks.loadtest --url http://127.0.0.1:8000 --requests 2000 --concurrency 32
+
+
+def build_workload(categories, products, n, seed=42):
+    rng = random.Random(seed)
+    work = []
+    for _ in range(n):
+        kind = rng.choice(["filter", "recommend", "compare", "simulate"])
+        if kind == "filter":
+            body = {
+                "category": rng.choice(categories),
+                "rating_range": [rng.choice([3.0, 3.5, 4.0]), 5.0],
+                "limit": 50,
+            }
+        elif kind == "recommend":
+            body = {
+                "category": rng.choice(categories),
+                "max_budget": rng.choice([500, 1000, 2000, 5000]),
+                "min_rating": rng.choice([3.5, 4.0]),
+                "preference": rng.choice(
+                    ["Best overall", "Best value (discount)", "Most trusted", "Most popular"]
+                ),
+                "top_n": 15,
+            }
+        elif kind == "compare":
+            a, b = rng.sample(products, 2)
+            body = {"product_a": a, "product_b": b}
+        else:
+            body = {
+                "product_name": rng.choice(products),
+                "new_actual": rng.choice([999.0, 1999.0, 4999.0]),
+                "new_discounted": rng.choice([299.0, 799.0, 1499.0]),
+            }
+        work.append((kind, body))
+    return work
+
+
+async def run(url, work, concurrency):
+    latencies = {kind: [] for kind in ("filter", "recommend", "compare", "simulate")}
+    errors = 0
+    queue = asyncio.Queue()
+    for item in work:
+        queue.put_nowait(item)
+
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                kind, body = queue.get_nowait()
+                t0 = time.perf_counter()
+                r = await client.post(f"/{kind}", json=body)
+                latencies[kind].append(time.perf_counter() - t0)
+                if r.status_code != 200:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - t0
+
+    return latencies, errors, elapsed
+
+
+def summarize(latencies, errors, elapsed):
+    report = {"elapsed_s": round(elapsed, 3), "errors": errors, "endpoints": {}}
+    everything = []
+    for kind, values in latencies.items():
+        if not values:
+            continue
+        everything.extend(values)
+        arr = np.array(values) * 1000
+        report["endpoints"][kind] = {
+            "requests": len(values),
+            "p50_ms": round(float(np.percentile(arr, 50)), 2),
+            "p99_ms": round(float(np.percentile(arr, 99)), 2),
+        }
+    arr = np.array(everything) * 1000
+    report["requests"] = len(everything)
+    report["requests_per_sec"] = round(len(everything) / elapsed, 1)
+    report["p50_ms"] = round(float(np.percentile(arr, 50)), 2)
+    report["p99_ms"] = round(float(np.percentile(arr, 99)), 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the product intelligence API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Seed the workload with real categories / product names from the running service
+    seed = httpx.post(f"{args.url}/filter", json={"limit": 5000}, timeout=60).json()["products"]
+    categories = ["All"] + sorted({p["main_category"] for p in seed})
+    products = sorted({p["product_name"] for p in seed})
+
+    work = build_workload(categories, products, args.requests, args.seed)
+    latencies, errors, elapsed = asyncio.run(run(args.url, work, args.concurrency))
+    print(json.dumps(summarize(latencies, errors, elapsed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
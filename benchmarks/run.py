@@ -0,0 +1,287 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import add_nlp
+import generate_data
+import intelligence
+import query_cache
+import rescoring
+import risk_analytics
+from benchmarks.synthetic import write_catalog
+
+# Benchmark suite for the offline pipeline and the dashboard hot paths.
+#
+#   python -m benchmarks.run --sizes 10k,100k --out bench.json
+#   python -m benchmarks.compare baseline.json bench.json
+#
+# Every pipeline stage of generate_data.py / add_nlp.py and every page hot
+# path is timed on a synthetic catalog of each size. Peak memory of each
+# step is recorded in a separate run, so tracing does not distort the
+# timings: peak_mb is the Python heap (tracemalloc) plus Arrow's memory pool
+# (CSV / Parquet reads allocate there, invisible to tracemalloc), sampled
+# together every few ms; rss_mb is the process RSS growth over the step. Use --skip to leave out slow stages
+# (e.g. --skip add_text_features,add_sentiment on 1M+ rows).
+
+SIZES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    if text[-1] in SIZES:
+        return int(float(text[:-1]) * SIZES[text[-1]])
+    return int(text)
+
+
+def _rss():
+    # resident set size in bytes (Linux); None elsewhere
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class PeakMemory:
+    # peak Python heap + Arrow pool bytes, and peak RSS growth, while the block runs
+    INTERVAL = 0.002
+
+    def __enter__(self):
+        tracemalloc.start()
+        self.arrow0, self.rss0 = pa.total_allocated_bytes(), _rss()
+        self.peak = self.arrow_peak = self.rss_peak = 0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        arrow = pa.total_allocated_bytes() - self.arrow0
+        self.arrow_peak = max(self.arrow_peak, arrow)
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[0] + arrow)
+        rss = _rss()
+        if rss is not None and self.rss0 is not None:
+            self.rss_peak = max(self.rss_peak, rss - self.rss0)
+
+    def _run(self):
+        while not self._done.wait(self.INTERVAL):
+            self._sample()
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+        self._sample()
+        # the exact heap peak, in case it fell between two samples
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        return False
+
+
+def measure(fn, *args, repeat=1, trace_memory=True):
+    # Returns (result of the last run, {"seconds", "seconds_median", "peak_mb", "arrow_mb", "rss_mb"})
+    times = []
+    result = None
+    for _ in range(repeat):
+        call_args = [a.copy() if isinstance(a, pd.DataFrame) else a for a in args]
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn(*call_args)
+        times.append(time.perf_counter() - t0)
+
+    record = {"seconds": round(min(times), 6), "seconds_median": round(float(np.median(times)), 6)}
+
+    if trace_memory:
+        call_args = [a.copy() if isinstance(a, pd.DataFrame) else a for a in args]
+        gc.collect()
+        with PeakMemory() as mem:
+            fn(*call_args)
+        record["peak_mb"] = round(mem.peak / 1e6, 3)
+        record["arrow_mb"] = round(mem.arrow_peak / 1e6, 3)
+        if mem.rss0 is not None:
+            record["rss_mb"] = round(mem.rss_peak / 1e6, 3)
+
+    return result, record
+
+
+# ---------- Offline pipeline ----------
+def bench_pipeline(raw_path, skip, trace_memory):
+    results = {}
+    _, results["load_raw"] = measure(generate_data.load_raw, raw_path, trace_memory=trace_memory)
+    df = generate_data.load_raw(raw_path)
+
+    for stage in generate_data.STAGES + add_nlp.STAGES:
+        if stage.__name__ in skip:
+            continue
+        df, results[stage.__name__] = measure(stage, df, trace_memory=trace_memory)
+
+    return df, results
+
+
+# ---------- Dashboard hot paths ----------
+def bench_pages(scored, repeat, trace_memory, seed=42):
+    rng = np.random.default_rng(seed)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scored.csv")
+        scored.to_csv(path, index=False)
+        df, results["load_products"] = measure(
+            intelligence.load_products, path, repeat=repeat, trace_memory=trace_memory
+        )
+
+    category = df["main_category"].mode().iloc[0]
+    names = df["product_name"].astype(str).to_numpy()
+    sample_names = names[rng.integers(0, len(names), 100)]
+    p_lo, p_hi = df["discounted_price"].quantile([0.1, 0.9])
+    # dataset version for the caches: one per catalog, so a later size never reuses this one's entries
+    version = f"bench-{len(df)}-{seed}"
+
+    def explorer_filter(d):
+        return intelligence.filter_products(
+            d, category=category, price_range=(p_lo, p_hi),
+            discount_range=(10, 90), rating_range=(3.5, 5.0),
+        )
+
+    def explorer_search(d):
+        return intelligence.filter_products(d, search_query="usb cable")
+
+    def explorer_rank(d):
+        return intelligence.rank_products(d).head(10)
+
+    def category_groupby(d):
+        return intelligence.category_summary(d)
+
+    def recommend_all(d):
+        return [
+            intelligence.recommend(d, max_budget=2000, min_rating=3.5, preference=p, top_n=15)
+            for p in intelligence.PREFERENCE_WEIGHTS
+        ]
+
+    def product_list(d):
+        return sorted(d["product_name"].astype(str).unique().tolist())
+
+    def product_lookup(d):
+        return [d[d["product_name"] == name].iloc[0] for name in sample_names]
+
+    def risky_products(d):
+        if "risk_flag" not in d.columns or "sentiment_score" not in d.columns:
+            return None
+        return risk_analytics.top_risky(d, n=50)
+
+    hot_paths = [
+        intelligence.deal_badges, explorer_filter, explorer_search, explorer_rank,
+        category_groupby, recommend_all, product_list, product_lookup, risky_products,
+    ]
+    for fn in hot_paths:
+        # hot paths only read the frame, so one shared copy is enough
+        _, results[fn.__name__] = measure(lambda: fn(df), repeat=repeat, trace_memory=trace_memory)
+
+    # the Explorer filter + rank and the recommendations again, answered from a warm query cache
+    cache = query_cache.QueryCache()
+
+    def explorer_cached(d):
+        return query_cache.cached(
+            intelligence.ranked_products, d, version, cache=cache, category=category,
+            price_range=(p_lo, p_hi), discount_range=(10, 90), rating_range=(3.5, 5.0),
+        )
+
+    def recommend_cached(d):
+        return [
+            query_cache.cached(
+                intelligence.recommend, d, version, cache=cache,
+                max_budget=2000, min_rating=3.5, preference=p, top_n=15,
+            )
+            for p in intelligence.PREFERENCE_WEIGHTS
+        ]
+
+    for fn in (explorer_cached, recommend_cached):
+        fn(df)
+        _, results[fn.__name__] = measure(lambda: fn(df), repeat=repeat, trace_memory=trace_memory)
+
+    # whole-catalog re-scoring for a weight set not seen before (memo bypassed; the
+    # per-version components are built once, by the warm-up call)
+    def rescore_weights(d):
+        return rescoring.rescore(
+            d, version, cache=query_cache.QueryCache(max_bytes=0),
+            discount=0.5, price=0.5, m_quantile=0.8, trust=0.3, value=0.5, popularity=0.2,
+        )
+
+    rescore_weights(df)
+    _, results["rescore_weights"] = measure(lambda: rescore_weights(df), repeat=repeat, trace_memory=trace_memory)
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline and dashboard hot paths")
+    parser.add_argument("--sizes", default="10k,100k", help="comma separated, e.g. 10k,100k,1M,10M")
+    parser.add_argument("--repeat", type=int, default=3, help="repeats per page hot path (min is reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip", default="", help="comma separated stage / hot path names to skip")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak-memory runs")
+    parser.add_argument("--out", default="bench.json")
+    args = parser.parse_args()
+
+    skip = {s.strip() for s in args.skip.split(",") if s.strip()}
+    trace_memory = not args.no_memory
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "skip": sorted(skip),
+        },
+        "results": {},
+    }
+
+    for size in [parse_size(s) for s in args.sizes.split(",")]:
+        print(f"--- {size:,} products ---")
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_path = os.path.join(tmp, "amazon.csv")
+            write_catalog(raw_path, size, seed=args.seed)
+            scored, pipeline = bench_pipeline(raw_path, skip, trace_memory)
+
+        pages = bench_pages(scored, args.repeat, trace_memory, args.seed)
+        pages = {k: v for k, v in pages.items() if k not in skip}
+        report["results"][str(size)] = {"pipeline": pipeline, "pages": pages}
+
+        for group, entries in (("pipeline", pipeline), ("pages", pages)):
+            for name, rec in entries.items():
+                mem = f"{rec['peak_mb']:>10.1f} MB" if "peak_mb" in rec else ""
+                if "rss_mb" in rec:
+                    mem += f"  (RSS +{rec['rss_mb']:.1f} MB)"
+                print(f"{group:>8}  {name:<20} {rec['seconds']:>10.4f} s {mem}")
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
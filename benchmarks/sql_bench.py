@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+
+import generate_data
+import intelligence
+import risk_analytics
+import sql_backend
+from benchmarks.run import measure, parse_size
+from benchmarks.synthetic import generate_catalog
+
+# Dashboard queries on the pandas path (whole catalog in memory) versus the
+# SQLite backend (filters, group-bys and top-N pushed down to the database).
+#
+#   python -m benchmarks.sql_bench --sizes 100k,1M
+#
+# The catalog is scored with the generate_data.py stages; the NLP columns are
+# drawn at random since only their distribution matters for query timing.
+# "load" is the per-process cost the pandas path pays before any query.
+
+
+def build_scored(n, seed):
+    df = generate_catalog(n, seed=seed)
+    for stage in (
+        generate_data.clean, generate_data.add_listing_groups, generate_data.add_features,
+        generate_data.score, generate_data.segment,
+    ):
+        df = stage(df)
+    rng = np.random.default_rng(seed)
+    df["sentiment_score"] = rng.uniform(-1, 1, len(df)).round(4)
+    df["risk_flag"] = (rng.random(len(df)) < 0.3).astype(int)
+    df["main_category"] = intelligence.main_category(df["category"])
+    return df.reset_index(drop=True)
+
+
+def bench_size(df, repeat, trace_memory):
+    category = df["main_category"].mode().iloc[0]
+    p_lo, p_hi = df["discounted_price"].quantile([0.1, 0.9])
+    explorer = dict(
+        category=category, price_range=(p_lo, p_hi), discount_range=(10, 90), rating_range=(3.5, 5.0),
+    )
+    search = dict(search_query="usb cable")
+
+    def pandas_explorer(d):
+        f = intelligence.filter_products(d, **explorer)
+        return len(f), f["rating"].mean(), intelligence.rank_products(f).head(500)
+
+    def pandas_search(d):
+        f = intelligence.filter_products(d, **search)
+        return len(f), intelligence.rank_products(f).head(500)
+
+    def pandas_recommend(d):
+        return [
+            intelligence.recommend(d, category=category, max_budget=2000, min_rating=3.5, preference=p)
+            for p in intelligence.PREFERENCE_WEIGHTS
+        ]
+
+    def sql_explorer(path):
+        return sql_backend.filter_summary(path=path, **explorer), sql_backend.filter_products(limit=500, path=path, **explorer)
+
+    def sql_search(path):
+        return sql_backend.filter_summary(path=path, **search), sql_backend.filter_products(limit=500, path=path, **search)
+
+    def sql_recommend(path):
+        return [
+            sql_backend.recommend(category=category, max_budget=2000, min_rating=3.5, preference=p, path=path)
+            for p in intelligence.PREFERENCE_WEIGHTS
+        ]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "scored.csv")
+        db_path = os.path.join(tmp, "products.db")
+        df.to_csv(csv_path, index=False)
+        _, results["build_db"] = measure(sql_backend.write_db, df, db_path, trace_memory=False)
+
+        loaded, record = measure(intelligence.load_products, csv_path, trace_memory=trace_memory)
+        results["load"] = {"pandas": record}
+
+        pairs = {
+            "explorer_filter": (pandas_explorer, sql_explorer),
+            "explorer_search": (pandas_search, sql_search),
+            "category_summary": (intelligence.category_summary, lambda p: sql_backend.category_summary(path=p)),
+            "recommend_all": (pandas_recommend, sql_recommend),
+            "risky_products": (risk_analytics.top_risky, lambda p: sql_backend.top_risky(n=50, path=p)),
+        }
+        for name, (pandas_fn, sql_fn) in pairs.items():
+            _, pandas_rec = measure(lambda: pandas_fn(loaded), repeat=repeat, trace_memory=trace_memory)
+            _, sql_rec = measure(lambda: sql_fn(db_path), repeat=repeat, trace_memory=trace_memory)
+            results[name] = {"pandas": pandas_rec, "sqlite": sql_rec}
+
+        results["db_mb"] = round(os.path.getsize(db_path) / 1e6, 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite backend against the pandas path")
+    parser.add_argument("--sizes", default="100k", help="comma separated, e.g. 100k,1M")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak-memory runs")
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    report = {}
+    for size in [parse_size(s) for s in args.sizes.split(",")]:
+        print(f"--- {size:,} products ---")
+        results = bench_size(build_scored(size, args.seed), args.repeat, not args.no_memory)
+        report[str(size)] = results
+        for name, rec in results.items():
+            if name in ("build_db", "db_mb"):
+                continue
+            line = f"{name:<18}" + "".join(
+                f"  {backend:>6} {r['seconds']:>9.4f} s" + (f" {r['peak_mb']:>8.1f} MB" if "peak_mb" in r else "")
+                for backend, r in rec.items()
+            )
+            print(line)
+        print(f"{'build_db':<18}  {results['build_db']['seconds']:.2f} s, {results['db_mb']} MB on disk")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
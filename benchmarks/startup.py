@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# Cold-start import profile for the dashboard and the batch scripts.
+#
+#   python -m benchmarks.startup                  # report
+#   python -m benchmarks.startup --check          # exit 1 when a target is over budget
+#   python -m benchmarks.startup --out startup.json
+#
+# Each target is imported in a fresh interpreter with `python -X importtime`
+# (best of --repeat runs), and the packages that cost the most are listed.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# target -> modules imported at startup
+TARGETS = {
+    "dashboard": ["streamlit", "intelligence", "utils", "sql_backend", "review_store"],
+    "api": ["api"],
+    "generate_data": ["generate_data"],
+    "add_nlp": ["add_nlp"],
+    "pipeline": ["pipeline"],
+}
+
+# import-time budgets in ms; pandas alone is ~0.5 s and streamlit another ~0.4 s
+BUDGETS_MS = {
+    "dashboard": 1500,
+    "api": 1500,
+    "generate_data": 900,
+    "add_nlp": 900,
+    "pipeline": 1200,
+}
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def import_profile(modules):
+    # {"ms": total import time, "packages": {root package: ms}}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {', '.join(modules)} failed:\n{proc.stderr[-2000:]}")
+
+    total = 0.0
+    packages = {}
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if not m:
+            continue
+        ms = int(m.group(2)) / 1000
+        if not m.group(3):  # no indent: imported by the -c statement itself
+            total += ms
+        # a package's outermost import line carries its whole cumulative cost
+        root = m.group(4).split(".")[0]
+        if root not in modules:
+            packages[root] = max(packages.get(root, 0.0), ms)
+    return {"ms": round(total, 1), "packages": packages}
+
+
+def profile_target(modules, repeat):
+    runs = [import_profile(modules) for _ in range(repeat)]
+    best = min(runs, key=lambda r: r["ms"])
+    heaviest = sorted(best["packages"].items(), key=lambda kv: kv[1], reverse=True)[:5]
+    return {"ms": best["ms"], "heaviest": {name: round(ms, 1) for name, ms in heaviest}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of the app and scripts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--targets", default=",".join(TARGETS), help="comma separated subset of targets")
+    parser.add_argument("--check", action="store_true", help="exit 1 when a target exceeds its budget")
+    parser.add_argument("--out", default=None, help="also write the results as JSON")
+    args = parser.parse_args()
+
+    report = {}
+    over = []
+    for name in [t.strip() for t in args.targets.split(",") if t.strip()]:
+        result = profile_target(TARGETS[name], args.repeat)
+        result["budget_ms"] = BUDGETS_MS[name]
+        report[name] = result
+        if result["ms"] > result["budget_ms"]:
+            over.append(name)
+
+        status = "OVER" if name in over else "ok"
+        heaviest = ", ".join(f"{m} {ms:.0f}" for m, ms in result["heaviest"].items())
+        print(f"{name:<14} {result['ms']:>8.0f} ms  (budget {result['budget_ms']:>5} ms, {status:>4})  {heaviest}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.out}")
+
+    if args.check and over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
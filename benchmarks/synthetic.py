@@ -0,0 +1,192 @@
+import argparse
+import string
+
+import numpy as np
+import pandas as pd
+
+# Synthetic catalog in the same raw format as the Kaggle amazon.csv
+# ("₹1,099" prices, "64%" discounts, "24,269" rating counts, "|" category
+# paths and comma-joined review fields, with commas inside some reviews too),
+# scalable to millions of rows.
+#
+#   python -m benchmarks.synthetic --rows 100000 --out data/synthetic_100k.csv
+#
+# write_catalog() generates and appends CHUNK_ROWS rows at a time, each
+# chunk with its own seed spawned from --seed, so memory stays flat at 10M+
+# rows. A catalog that fits in one chunk is exactly generate_catalog(n, seed).
+
+CATEGORY_PATHS = [
+    "Computers&Accessories|Accessories&Peripherals|Cables&Accessories|Cables|USBCables",
+    "Computers&Accessories|Accessories&Peripherals|Keyboards,Mice&InputDevices|Mice",
+    "Computers&Accessories|NetworkingDevices|NetworkAdapters|WirelessUSBAdapters",
+    "Computers&Accessories|ExternalDevices&DataStorage|PenDrives",
+    "Electronics|HomeTheater,TV&Video|Accessories|Cables|HDMICables",
+    "Electronics|HomeTheater,TV&Video|Televisions|SmartTelevisions",
+    "Electronics|Mobiles&Accessories|MobileAccessories|Chargers|WallChargers",
+    "Electronics|Mobiles&Accessories|Smartphones&BasicMobiles|Smartphones",
+    "Electronics|Headphones,Earbuds&Accessories|Headphones|In-Ear",
+    "Electronics|WearableTechnology|SmartWatches",
+    "Home&Kitchen|Kitchen&HomeAppliances|SmallKitchenAppliances|Kettles&HotWaterDispensers",
+    "Home&Kitchen|Heating,Cooling&AirQuality|RoomHeaters|FanHeaters",
+    "Home&Kitchen|Kitchen&HomeAppliances|Vacuum,Cleaning&Ironing|Irons,Steamers&Accessories",
+    "OfficeProducts|OfficePaperProducts|Paper|Stationery|Pens,Pencils&WritingSupplies",
+    "MusicalInstruments|Microphones|Condenser",
+    "HomeImprovement|Electrical|CordManagement",
+    "Toys&Games|Arts&Crafts|Drawing&PaintingSupplies|ColouringPens&Markers",
+    "Car&Motorbike|CarAccessories|InteriorAccessories|AirPurifiers&Ionizers",
+    "Health&PersonalCare|HomeMedicalSupplies&Equipment|HealthMonitors|WeighingScales",
+]
+
+BRANDS = [
+    "boAt", "Ambrane", "Portronics", "pTron", "Wayona", "AmazonBasics", "Syska", "Redmi",
+    "Samsung", "OnePlus", "Noise", "Fire-Boltt", "Logitech", "HP", "SanDisk", "TP-Link",
+    "Pigeon", "Prestige", "Philips", "Havells", "Bajaj", "Classmate", "Camlin", "Zebronics",
+]
+
+PRODUCTS = [
+    "USB Type C Cable", "Micro USB Cable", "Lightning Cable", "HDMI Cable", "Wireless Mouse",
+    "WiFi Adapter", "Pen Drive", "Smart TV", "Wall Charger", "Smartphone", "Wired Earphones",
+    "Smart Watch", "Electric Kettle", "Fan Heater", "Steam Iron", "Gel Pen Set",
+    "Condenser Microphone", "Cable Organizer", "Sketch Pens", "Car Air Purifier", "Weighing Scale",
+]
+
+CHUNK_ROWS = 100_000
+
+VARIANTS = ["1m", "1.5m", "2m", "3m", "Pack of 2", "Pack of 5", "32GB", "64GB", "128GB", "1500W", "2000W"]
+COLORS = ["Black", "White", "Blue", "Red", "Grey", "Green"]
+
+REVIEW_SNIPPETS = [
+    "Looks durable Charging is fine too No complains",
+    "Good product, works as expected",
+    "Value for money, fast delivery",
+    "Excellent quality and the build feels premium",
+    "Nice product but packaging could be better",
+    "Average product - does the job",
+    "Stopped working after a week, waste of money",
+    "Received a fake product - asked for a refund",
+    "Broken on arrival - very poor quality",
+    "Duplicate item - worst purchase ever",
+    "Defective unit - had to return it",
+    "It is okay for the price",
+    "Bad experience - damage in the box",
+    "Superb sound and battery backup",
+    "Quality is not good, disappointed",
+]
+
+REVIEW_TITLES = [
+    "Satisfied", "Good product", "Value for money", "Worst product", "Not bad",
+    "Excellent", "Fake product", "Does the job", "Waste of money", "Nice",
+]
+
+ABOUT_SNIPPETS = [
+    "Compatible with all Type C enabled devices",
+    "Fast charging and data transfer up to 480 Mbps",
+    "Tangle free nylon braided design",
+    "1 year warranty from the brand",
+    "Energy efficient with auto shut off",
+    "Lightweight and easy to carry",
+]
+
+
+def _random_ids(rng, n, length, alphabet=string.ascii_uppercase + string.digits):
+    chars = np.array(list(alphabet))
+    codes = chars[rng.integers(0, len(chars), size=(n, length), dtype=np.uint8)]
+    return codes.view(f"<U{length}").ravel()
+
+
+def _join_choices(rng, pool, n, k, sep):
+    pool = np.asarray(pool, dtype=object)
+    picks = pool[rng.integers(0, len(pool), size=(n, k))]
+    return [sep.join(row) for row in picks]
+
+
+def _rupees(values):
+    return pd.Series(values).map("₹{:,.0f}".format)
+
+
+def generate_catalog(n, seed=42, reviews_per_product=4, malformed_rate=0.001):
+    rng = np.random.default_rng(seed)
+
+    # ---------- Names: several near-identical listings per base product ----------
+    n_base = max(1, n // 3)
+    base_brand = rng.integers(0, len(BRANDS), n_base)
+    base_product = rng.integers(0, len(PRODUCTS), n_base)
+    base_model = pd.Series(_random_ids(rng, n_base, 6)) + " " + pd.Series(_random_ids(rng, n_base, 6))
+    base = rng.integers(0, n_base, n)
+    brands = np.asarray(BRANDS, dtype=object)[base_brand[base]]
+    products = np.asarray(PRODUCTS, dtype=object)[base_product[base]]
+    models = base_model.to_numpy()[base]
+    variants = np.asarray(VARIANTS, dtype=object)[rng.integers(0, len(VARIANTS), n)]
+    colors = np.asarray(COLORS, dtype=object)[rng.integers(0, len(COLORS), n)]
+    names = (
+        pd.Series(brands) + " " + pd.Series(products) + " " + pd.Series(models) + " " + pd.Series(variants)
+        + " (" + pd.Series(colors) + ")"
+    )
+
+    # each product type lives in one category path
+    product_category = rng.integers(0, len(CATEGORY_PATHS), len(PRODUCTS))
+    category = np.asarray(CATEGORY_PATHS, dtype=object)[product_category[base_product[base]]]
+
+    # ---------- Prices ----------
+    actual = np.clip(np.round(rng.lognormal(7.2, 1.1, n)), 39, 140000)
+    discount = np.clip(np.round(rng.beta(2.2, 2.0, n) * 94), 0, 94)
+    discounted = np.maximum(np.round(actual * (1 - discount / 100)), 1)
+
+    rating = np.clip(np.round(rng.normal(4.1, 0.3, n), 1), 2.0, 5.0)
+    rating_count = np.round(rng.lognormal(7.0, 2.2, n)).astype(np.int64)
+
+    df = pd.DataFrame({
+        "product_id": pd.Series(_random_ids(rng, n, 8)).radd("B0"),
+        "product_name": names,
+        "category": category,
+        "discounted_price": _rupees(discounted),
+        "actual_price": _rupees(actual),
+        "discount_percentage": pd.Series(discount.astype(np.int64)).astype(str) + "%",
+        "rating": pd.Series(rating).astype(str),
+        "rating_count": pd.Series(rating_count).map("{:,}".format),
+        "about_product": _join_choices(rng, ABOUT_SNIPPETS, n, 3, "|"),
+        "user_id": _join_choices(rng, _random_ids(rng, 5000, 28), n, reviews_per_product, ","),
+        "user_name": _join_choices(rng, ["Manav", "Adarsh gupta", "Sundeep", "ASHIK", "Raju"], n, reviews_per_product, ","),
+        "review_id": _join_choices(rng, pd.Series(_random_ids(rng, 5000, 13)).radd("R"), n, reviews_per_product, ","),
+        "review_title": _join_choices(rng, REVIEW_TITLES, n, reviews_per_product, ","),
+        "review_content": _join_choices(rng, REVIEW_SNIPPETS, n, reviews_per_product, ","),
+    })
+    df["img_link"] = "https://m.media-amazon.com/images/I/" + df["product_id"] + "._SX300_SY300_.jpg"
+    df["product_link"] = "https://www.amazon.in/dp/" + df["product_id"]
+
+    # ---------- A few malformed values, like the real file ----------
+    if malformed_rate > 0:
+        bad = rng.random(n) < malformed_rate
+        df.loc[bad, "rating"] = "|"
+        bad = rng.random(n) < malformed_rate
+        df.loc[bad, "rating_count"] = np.nan
+
+    return df
+
+
+def write_catalog(path, n, seed=42, reviews_per_product=4, malformed_rate=0.001, chunk_rows=CHUNK_ROWS):
+    if n <= chunk_rows:
+        generate_catalog(n, seed, reviews_per_product, malformed_rate).to_csv(path, index=False)
+        return
+    # near-duplicate listings are drawn within a chunk; 100k rows is plenty for that
+    seeds = np.random.SeedSequence(seed).spawn(-(-n // chunk_rows))
+    for i, chunk_seed in enumerate(seeds):
+        rows = min(chunk_rows, n - i * chunk_rows)
+        chunk = generate_catalog(rows, chunk_seed, reviews_per_product, malformed_rate)
+        chunk.to_csv(path, index=False, mode="w" if i == 0 else "a", header=i == 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic raw Amazon catalog")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reviews-per-product", type=int, default=4)
+    parser.add_argument("--out", default="data/amazon.csv")
+    args = parser.parse_args()
+
+    write_catalog(args.out, args.rows, args.seed, args.reviews_per_product)
+    print(f"Wrote {args.rows:,} synthetic products to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+from profiling import timed
+
+# Near-duplicate listing detection (same product listed under several
+# colours / sizes / pack counts with almost the same title).
+#
+# Names are lower-cased and reduced to letters and digits, then cut into
+# SHINGLE-byte shingles. Each name gets a NUM_PERM value MinHash signature;
+# the fraction of equal values between two signatures estimates the Jaccard
+# similarity of their shingle sets. LSH splits the signatures into BANDS
+# bands: names that agree on a whole band land in the same bucket, and only
+# bucket members are compared, so the work grows linearly with the catalog
+# instead of with every pair. Members whose estimated similarity to their
+# bucket's first name reaches THRESHOLD are linked, and each connected
+# component of links becomes one listing_group_id.
+#
+# Buckets are also keyed on the first word of the name (the brand on Amazon
+# titles): a different brand's "USB Type C Cable 1m (Black)" shares most of
+# its shingles but is not the same listing.
+
+SHINGLE = 4
+NUM_PERM = 64
+BANDS = 16  # 4 rows per band: a pair at THRESHOLD shares a bucket with ~99% probability
+THRESHOLD = 0.7
+SEED = 7
+CHUNK = 50_000  # names hashed per batch, bounds the shingle arrays' memory
+
+
+def normalize_names(names):
+    names = names.fillna("").astype(str).str.lower()
+    return names.str.replace(r"[\W_]+", " ", regex=True).str.strip()
+
+
+def _shingles(names):
+    # (shingle codes, start of each name's run); a shingle is SHINGLE utf-8
+    # bytes packed into one uint32, short names are padded to one shingle
+    encoded = names.str.pad(SHINGLE, side="right").str.encode("utf-8")
+    lengths = encoded.str.len().to_numpy(dtype=np.int64)
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    counts = lengths - SHINGLE + 1
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    name_offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    pos = np.arange(counts.sum()) + np.repeat(name_offsets - starts, counts)
+
+    codes = np.zeros(len(pos), dtype=np.uint64)
+    for k in range(SHINGLE):
+        codes = (codes << np.uint64(8)) | buf[pos + k]
+    return codes, starts
+
+
+def _permutations(num_perm=NUM_PERM, seed=SEED):
+    # multiply-add-shift hashes ((a * x + b) mod 2**64) >> 32 with odd a
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+    return a, b
+
+
+@timed()
+def minhash_signatures(names, num_perm=NUM_PERM, seed=SEED):
+    # (len(names), num_perm) uint32 signatures of already normalized names
+    a, b = _permutations(num_perm, seed)
+    shift = np.uint64(32)
+    sig = np.empty((len(names), num_perm), dtype=np.uint32)
+    for lo in range(0, len(names), CHUNK):
+        codes, starts = _shingles(names.iloc[lo:lo + CHUNK])
+        for p in range(num_perm):
+            hashed = (codes * a[p] + b[p]) >> shift
+            sig[lo:lo + len(starts), p] = np.minimum.reduceat(hashed, starts)
+    return sig
+
+
+def _band_keys(band):
+    # one uint64 per row for a (n, rows) slice of the signatures
+    key = np.zeros(len(band), dtype=np.uint64)
+    for col in band.T:
+        key = (key ^ col) * np.uint64(0x9E3779B97F4A7C15)
+    return key
+
+
+def candidate_pairs(sig, bands=BANDS, blocks=None):
+    # (a, b) row pairs that share at least one band bucket (and block); b is the bucket's first row
+    rows = sig.shape[1] // bands
+    salt = np.uint64(0) if blocks is None else blocks.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)
+    pairs = []
+    for i in range(bands):
+        key = _band_keys(sig[:, i * rows:(i + 1) * rows]) ^ salt
+        order = np.argsort(key)
+        sorted_key = key[order]
+        new_bucket = np.concatenate([[True], sorted_key[1:] != sorted_key[:-1]])
+        head = order[np.flatnonzero(new_bucket)[np.cumsum(new_bucket) - 1]]
+        member = ~new_bucket
+        pairs.append(order[member].astype(np.int64) * len(sig) + head[member])
+    if not pairs:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    # a pair found in several bands is verified once
+    pairs = np.unique(np.concatenate(pairs))
+    return pairs // len(sig), pairs % len(sig)
+
+
+def estimated_similarity(sig, a, b, batch=CHUNK):
+    out = np.empty(len(a))
+    for lo in range(0, len(a), batch):
+        sl = slice(lo, lo + batch)
+        out[sl] = (sig[a[sl]] == sig[b[sl]]).mean(axis=1)
+    return out
+
+
+@timed()
+def listing_groups(names, threshold=THRESHOLD, bands=BANDS, num_perm=NUM_PERM, seed=SEED):
+    # listing_group_id per name (same index), numbered in order of first appearance
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    norm = normalize_names(names)
+    # identical titles are one group from the start; only distinct ones are hashed
+    codes, uniques = pd.factorize(norm)
+    uniques = pd.Series(uniques)
+    rows = np.flatnonzero((uniques != "").to_numpy())
+    n = len(uniques)
+
+    a = b = np.empty(0, dtype=np.int64)
+    if len(rows):
+        sig = minhash_signatures(uniques.iloc[rows], num_perm, seed)
+        brands = pd.factorize(uniques.iloc[rows].str.split(" ", n=1).str[0])[0]
+        a, b = candidate_pairs(sig, bands, brands)
+        keep = estimated_similarity(sig, a, b) >= threshold
+        a, b = rows[a[keep]], rows[b[keep]]
+
+    # names without any letters or digits stay in a group of their own
+    links = coo_matrix((np.ones(len(a), dtype=np.int8), (a, b)), shape=(n, n))
+    _, labels = connected_components(links, directed=False)
+    return pd.Series(pd.factorize(labels[codes])[0], index=names.index, name="listing_group_id")
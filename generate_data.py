@@ -1,85 +1,112 @@
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-import nltk
-from textblob import TextBlob
-import re
-
-df = pd.read_csv("data/amazon.csv")
-
-def clean_price(x):
-    if pd.isna(x):
-        return np.nan
-    x = str(x).replace("₹", "").replace(",", "").strip()
-    return pd.to_numeric(x, errors="coerce")
-
-df["actual_price"] = df["actual_price"].apply(clean_price)
-df["discounted_price"] = df["discounted_price"].apply(clean_price)
-df["discount_percentage"] = (
-    df["discount_percentage"]
-    .astype(str)
-    .str.replace("%", "")
-    .str.strip()
-)
-df["discount_percentage"] = pd.to_numeric(df["discount_percentage"], errors="coerce")
-df["rating"] = pd.to_numeric(df["rating"], errors="coerce")
-df["rating_count"] = (
-    df["rating_count"]
-    .astype(str)
-    .str.replace(",", "")
-    .str.strip()
-)
-df["rating_count"] = pd.to_numeric(df["rating_count"], errors="coerce")
-df = df.drop_duplicates()
-df = df.dropna(subset=["actual_price", "discounted_price", "discount_percentage"])
-df["rating"] = df["rating"].fillna(df["rating"].median())
-df["rating_count"] = df["rating_count"].fillna(0)
-
-df["discount_amount"] = df["actual_price"] - df["discounted_price"]
-df["discount_ratio"] = df["discount_amount"] / df["actual_price"]
-df["price_bucket"] = pd.cut(df["discounted_price"], bins=5, labels=[
-    "Very Low", "Low", "Medium", "High", "Very High"
-])
-df["main_category"] = df["category"].astype(str).apply(lambda x: x.split("|")[0])
-
-df["popularity_score"] = (df["rating_count"] - df["rating_count"].min()) / (
-    df["rating_count"].max() - df["rating_count"].min()
-) * 100
-
-m = df["rating_count"].quantile(0.60)
-C = df["rating"].mean()
-
-def weighted_rating(row):
+from profiling import timed, span, print_report
+import dedup
+import ingest
+import price_history
+import price_outliers
+import snapshots
+from intelligence import RATING_PRIOR_QUANTILE, VALUE_WEIGHTS
+
+RAW_PATH = "data/amazon.csv"
+OUTPUT_PATH = "outputs/scored_segmented_products.csv"
+
+
+@timed()
+def load_raw(path=RAW_PATH):
+    # typed read: numeric columns come back already parsed (see ingest.py)
+    df, report = ingest.read_raw(path)
+    problems = ingest.format_report(report)
+    if problems:
+        print(f"Unparseable values in {path}:\n{problems}")
+    return df
+
+
+# ---------------------------
+# Cleaning
+# ---------------------------
+@timed()
+def clean(df):
+    # no-op for columns load_raw already parsed; parses "₹1,099" / "64%" / "24,269" strings otherwise
+    df, _ = ingest.parse_frame(df)
+    df = df.drop_duplicates()
+    df = df.dropna(subset=["actual_price", "discounted_price", "discount_percentage"])
+    df["rating"] = df["rating"].fillna(df["rating"].median())
+    df["rating_count"] = df["rating_count"].fillna(0)
+    return df
+
+
+# ---------------------------
+# Near-duplicate listings (MinHash / LSH over product names, see dedup.py)
+# ---------------------------
+@timed()
+def add_listing_groups(df):
+    df["listing_group_id"] = dedup.listing_groups(df["product_name"])
+    return df
+
+
+# ---------------------------
+# Feature engineering
+# ---------------------------
+@timed()
+def add_features(df):
+    df["discount_amount"] = df["actual_price"] - df["discounted_price"]
+    df["discount_ratio"] = df["discount_amount"] / df["actual_price"]
+    df["price_bucket"] = pd.cut(df["discounted_price"], bins=5, labels=[
+        "Very Low", "Low", "Medium", "High", "Very High"
+    ])
+    df["main_category"] = df["category"].astype(str).apply(lambda x: x.split("|")[0])
+    return df
+
+
+# ---------------------------
+# Inflated MRP vs similar products (group-wise median / MAD, see price_outliers.py)
+# ---------------------------
+@timed()
+def add_mrp_outliers(df):
+    outliers = price_outliers.mrp_outliers(df)
+    for col in outliers.columns:
+        df[col] = outliers[col]
+    return df
+
+
+# ---------------------------
+# Value / Trust / Popularity scoring
+# ---------------------------
+def weighted_rating(row, m, C):
     v = row["rating_count"]
     R = row["rating"]
     return (v/(v+m))*R + (m/(v+m))*C
 
-df["weighted_rating"] = df.apply(weighted_rating, axis=1)
-df["trust_score"] = (df["weighted_rating"] - df["weighted_rating"].min()) / (
-    df["weighted_rating"].max() - df["weighted_rating"].min()
-) * 100
 
-price_component = 1 - (df["discounted_price"] - df["discounted_price"].min()) / (
-    df["discounted_price"].max() - df["discounted_price"].min()
-)
+@timed()
+def score(df):
+    df["popularity_score"] = (df["rating_count"] - df["rating_count"].min()) / (
+        df["rating_count"].max() - df["rating_count"].min()
+    ) * 100
+
+    m = df["rating_count"].quantile(RATING_PRIOR_QUANTILE)
+    C = df["rating"].mean()
 
-discount_component = (df["discount_percentage"] - df["discount_percentage"].min()) / (
-    df["discount_percentage"].max() - df["discount_percentage"].min()
-)
+    df["weighted_rating"] = df.apply(weighted_rating, axis=1, args=(m, C))
+    df["trust_score"] = (df["weighted_rating"] - df["weighted_rating"].min()) / (
+        df["weighted_rating"].max() - df["weighted_rating"].min()
+    ) * 100
 
-df["value_score"] = (0.6 * discount_component + 0.4 * price_component) * 100
+    price_component = 1 - (df["discounted_price"] - df["discounted_price"].min()) / (
+        df["discounted_price"].max() - df["discounted_price"].min()
+    )
 
-features = df[["value_score", "trust_score", "popularity_score"]].copy()
+    discount_component = (df["discount_percentage"] - df["discount_percentage"].min()) / (
+        df["discount_percentage"].max() - df["discount_percentage"].min()
+    )
 
-scaler = StandardScaler()
-X = scaler.fit_transform(features)
+    df["value_score"] = (VALUE_WEIGHTS["discount"] * discount_component + VALUE_WEIGHTS["price"] * price_component) * 100
+    return df
 
-kmeans = KMeans(n_clusters=5, random_state=42)
-df["segment"] = kmeans.fit_predict(X)
 
+# ---------------------------
+# Segmentation (K-Means)
+# ---------------------------
 segment_map = {
     0: "Best Deals",
     1: "Discount Trap",
@@ -88,15 +115,30 @@ segment_map = {
     4: "Premium Picks"
 }
 
-df["segment_name"] = df["segment"].map(segment_map)
+
+@timed()
+def segment(df):
+    # sklearn is slow to import, so it is only loaded when segmenting
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.cluster import KMeans
+
+    features = df[["value_score", "trust_score", "popularity_score"]].copy()
+
+    scaler = StandardScaler()
+    X = scaler.fit_transform(features)
+
+    kmeans = KMeans(n_clusters=5, random_state=42)
+    df["segment"] = kmeans.fit_predict(X)
+    df["segment_name"] = df["segment"].map(segment_map)
+    return df
+
 
 # ---------------------------
 # NLP Features: Sentiment Analysis and Keyword Alerts
 # ---------------------------
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
-
 def get_sentiment(text):
+    from textblob import TextBlob  # loaded on first use, cached in sys.modules after that
+
     if pd.isna(text):
         return "Neutral"
     blob = TextBlob(str(text))
@@ -108,6 +150,7 @@ def get_sentiment(text):
     else:
         return "Neutral"
 
+
 def has_complaint_keywords(text):
     if pd.isna(text):
         return False
@@ -115,10 +158,41 @@ def has_complaint_keywords(text):
     text_lower = str(text).lower()
     return any(keyword in text_lower for keyword in keywords)
 
-df["sentiment"] = df["review_content"].apply(get_sentiment)
-df["complaint_risk"] = df["review_content"].apply(has_complaint_keywords)
 
-# Save the full scored and segmented dataset
-df.to_csv("outputs/scored_segmented_products.csv", index=False)
+def text_features(reviews):
+    return pd.DataFrame({
+        "sentiment": reviews.apply(get_sentiment),
+        "complaint_risk": reviews.apply(has_complaint_keywords),
+    }, index=reviews.index)
+
+
+@timed()
+def add_text_features(df):
+    features = text_features(df["review_content"])
+    df["sentiment"] = features["sentiment"]
+    df["complaint_risk"] = features["complaint_risk"]
+    return df
+
+
+STAGES = [clean, add_listing_groups, add_features, add_mrp_outliers, score, segment, add_text_features]
+
+
+def main():
+    df = load_raw()
+
+    for stage in STAGES:
+        df = stage(df)
+
+    # Save the full scored and segmented dataset
+    with span("save"):
+        snapshots.replace_csv(df, OUTPUT_PATH)
+        changed = price_history.append_snapshot(df)
+        version = snapshots.publish(snapshots.product_files(OUTPUT_PATH, df.columns))
+
+    print(f"Data generated and saved to {OUTPUT_PATH} (snapshot {version})")
+    print(f"Price history: {changed:,} changed product(s) appended to {price_history.HISTORY_DIR}")
+    print_report()
+
 
-print("Data generated and saved to outputs/scored_segmented_products.csv")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from profiling import timed
+
+# Typed ingestion for the Kaggle amazon.csv format.
+#
+# The numeric columns arrive as strings ("₹1,099", "64%", "24,269", "4.2").
+# Each one is parsed in a single vectorized pass with pyarrow compute
+# (strip the formatting characters, trim, validate, cast); values that do
+# not parse become NaN and are counted in the validation report.
+#
+#   python ingest.py data/amazon.csv --out data/amazon.parquet
+
+# column -> formatting characters to strip before parsing
+NUMERIC_COLUMNS = {
+    "discounted_price": "[₹,]",
+    "actual_price": "[₹,]",
+    "discount_percentage": "%",
+    "rating": None,
+    "rating_count": ",",
+}
+
+# what pd.to_numeric accepts for plain decimal input
+NUMBER_RE = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+
+def parse_column(values, strip=None):
+    # values: pyarrow (Chunked)Array of strings -> (float64 array, stats)
+    values = pc.cast(values, pa.string())
+    cleaned = pc.replace_substring_regex(values, strip, "") if strip else values
+    cleaned = pc.utf8_trim_whitespace(cleaned)
+
+    valid = pc.match_substring_regex(cleaned, NUMBER_RE)
+    missing = pc.fill_null(pc.equal(pc.utf8_trim_whitespace(values), ""), True)
+    malformed = pc.and_(pc.invert(pc.fill_null(valid, False)), pc.invert(missing))
+
+    parsed = pc.cast(pc.if_else(valid, cleaned, pa.scalar(None, pa.string())), pa.float64())
+
+    bad = values.filter(malformed)
+    stats = {
+        "missing": int(pc.sum(missing).as_py() or 0),
+        "malformed": len(bad),
+        "examples": pc.unique(bad)[:5].to_pylist(),
+    }
+    return parsed, stats
+
+
+def parse_table(table):
+    report = {"rows": table.num_rows, "columns": {}}
+    for col, strip in NUMERIC_COLUMNS.items():
+        if col not in table.column_names:
+            continue
+        if pa.types.is_floating(table[col].type) or pa.types.is_integer(table[col].type):
+            continue  # already typed
+        parsed, stats = parse_column(table[col], strip)
+        table = table.set_column(table.schema.get_field_index(col), col, parsed)
+        report["columns"][col] = stats
+    return table, report
+
+
+def parse_frame(df):
+    # same parsing for a pandas frame (no-op for columns that are already numeric)
+    report = {"rows": len(df), "columns": {}}
+    for col, strip in NUMERIC_COLUMNS.items():
+        if col not in df.columns or pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        parsed, stats = parse_column(pa.array(df[col].astype(object), type=pa.string(), from_pandas=True), strip)
+        df[col] = parsed.to_numpy(zero_copy_only=False)
+        report["columns"][col] = stats
+    return df, report
+
+
+def read_csv_table(path):
+    # numeric columns are read as strings so parse_column sees the raw text
+    convert = pv.ConvertOptions(
+        column_types={col: pa.string() for col in NUMERIC_COLUMNS},
+        strings_can_be_null=True,
+    )
+    return pv.read_csv(path, convert_options=convert)
+
+
+@timed()
+def read_raw(path):
+    # CSV -> parsed DataFrame + report; a typed .parquet file is read as-is
+    if str(path).endswith(".parquet"):
+        return pd.read_parquet(path), {"rows": None, "columns": {}}
+    table, report = parse_table(read_csv_table(path))
+    return table.to_pandas(), report
+
+
+def ingest(path, out):
+    table, report = parse_table(read_csv_table(path))
+    pq.write_table(table, out, compression="zstd")
+    return report
+
+
+def format_report(report):
+    lines = []
+    for col, stats in report["columns"].items():
+        if stats["missing"] or stats["malformed"]:
+            line = f"{col}: {stats['missing']:,} missing, {stats['malformed']:,} malformed"
+            if stats["examples"]:
+                line += f" (e.g. {', '.join(repr(x) for x in stats['examples'])})"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse the raw Amazon CSV into a typed Parquet file")
+    parser.add_argument("csv", nargs="?", default="data/amazon.csv")
+    parser.add_argument("--out", default="data/amazon.parquet")
+    parser.add_argument("--json", action="store_true", help="print the validation report as JSON")
+    args = parser.parse_args()
+
+    report = ingest(args.csv, args.out)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report) or "All numeric values parsed cleanly.")
+        print(f"Wrote {report['rows']:,} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
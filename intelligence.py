@@ -0,0 +1,277 @@
+import os
+import numpy as np
+import pandas as pd
+from profiling import timed
+from review_store import PRODUCTS_PATH
+
+DATA_PATH = "outputs/scored_segmented_products.csv"
+
+# Recommendation Engine blends (trust / value / popularity)
+PREFERENCE_WEIGHTS = {
+    "Best overall": {"trust": 0.45, "value": 0.35, "popularity": 0.20},
+    "Best value (discount)": {"trust": 0.25, "value": 0.60, "popularity": 0.15},
+    "Most trusted": {"trust": 0.70, "value": 0.20, "popularity": 0.10},
+    "Most popular": {"trust": 0.20, "value": 0.10, "popularity": 0.70},
+}
+
+# Compare page "overall intelligence score"
+OVERALL_WEIGHTS = PREFERENCE_WEIGHTS["Best overall"]
+
+# value_score = discount / price mix; trust_score shrinks ratings towards the mean
+# by the rating count at this quantile (generate_data.score)
+VALUE_WEIGHTS = {"discount": 0.6, "price": 0.4}
+RATING_PRIOR_QUANTILE = 0.60
+
+# deal badges in priority order, then the "no badge" mark
+BADGES = ["🔥 Hot Deal", "⚠️ Discount Trap", "💎 Hidden Gem", "🏆 Top Rated", "✅ Best Value", "—"]
+
+
+# ---------- Load data ----------
+def default_data_path():
+    # slim product frame from the review store, unless the CSV is newer
+    # (e.g. generate_data.py / add_nlp.py were run on their own)
+    if os.path.exists(PRODUCTS_PATH) and (
+        not os.path.exists(DATA_PATH) or os.path.getmtime(PRODUCTS_PATH) >= os.path.getmtime(DATA_PATH)
+    ):
+        return PRODUCTS_PATH
+    return DATA_PATH
+
+
+def dataset_version(file_path=None):
+    # changes whenever the data file is rewritten; used as a cache key
+    file_path = file_path or default_data_path()
+    if not os.path.exists(file_path):
+        return None
+    stat = os.stat(file_path)
+    return f"{file_path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+@timed()
+def load_products(file_path=None):
+    file_path = file_path or default_data_path()
+    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        return None
+    if file_path.endswith(".parquet"):
+        df = pd.read_parquet(file_path)
+    else:
+        df = pd.read_csv(file_path)
+    if "main_category" not in df.columns:
+        df["main_category"] = main_category(df["category"])
+    return df
+
+
+def main_category(category):
+    return category.astype(str).str.split("|", n=1).str[0]
+
+
+# ---------- Deal badges ----------
+def badge_conditions(value, trust, discount, popularity):
+    # priority-based deal badge rules for whole columns (Series or arrays), one per BADGES entry;
+    # the first that holds wins, BADGES[-1] when none does
+    return [
+        (value >= 80) & (trust >= 70),
+        (discount >= 60) & (trust < 40),
+        (trust >= 80) & (popularity < 25),
+        trust >= 85,
+        discount >= 50,
+    ]
+
+
+@timed()
+def deal_badges(df):
+    # badge_conditions in priority order, evaluated for the whole frame at once
+    conditions = badge_conditions(
+        df["value_score"], df["trust_score"], df["discount_percentage"], df["popularity_score"]
+    )
+    return pd.Series(np.select(conditions, BADGES[:-1], default=BADGES[-1]), index=df.index)
+
+
+# ---------- Product Explorer ----------
+@timed()
+def filter_products(
+    df,
+    search_query="",
+    category="All",
+    segment="All",
+    price_range=None,
+    discount_range=None,
+    rating_range=None,
+    only_risky=False,
+    only_mrp_outliers=False,
+    collapse=False,
+):
+    mask = pd.Series(True, index=df.index)
+
+    if search_query and search_query.strip():
+        mask &= df["product_name"].astype(str).str.contains(search_query, case=False, na=False, regex=False)
+
+    if category != "All":
+        mask &= df["main_category"] == category
+
+    if segment != "All":
+        mask &= df["segment_name"] == segment
+
+    for col, bounds in (
+        ("discounted_price", price_range),
+        ("discount_percentage", discount_range),
+        ("rating", rating_range),
+    ):
+        if bounds is not None:
+            mask &= (df[col] >= bounds[0]) & (df[col] <= bounds[1])
+
+    if only_risky and "risk_flag" in df.columns:
+        mask &= df["risk_flag"] == 1
+
+    if only_mrp_outliers and "mrp_outlier" in df.columns:
+        mask &= df["mrp_outlier"] == 1
+
+    if collapse and "listing_group_id" in df.columns:
+        return collapse_listings(rank_products(df[mask]))
+    return df[mask]
+
+
+@timed()
+def rank_products(df):
+    return df.sort_values(["trust_score", "value_score"], ascending=False)
+
+
+def ranked_products(df, **filters):
+    # filter_products in rank_products order (collapsed results come back ranked)
+    filtered = filter_products(df, **filters)
+    if filters.get("collapse") and "listing_group_id" in df.columns:
+        return filtered
+    return rank_products(filtered)
+
+
+def collapse_listings(ranked):
+    # first (best-ranked) row of each near-duplicate group, with the group's size among the rows
+    group = ranked["listing_group_id"]
+    best = ranked.drop_duplicates("listing_group_id")
+    return best.assign(listing_count=best["listing_group_id"].map(group.value_counts()))
+
+
+# ---------- Category Intelligence ----------
+@timed()
+def category_summary(df):
+    return df.groupby("main_category").agg(
+        product_count=("product_id", "count"),
+        avg_discount=("discount_percentage", "mean"),
+        avg_rating=("rating", "mean"),
+        avg_value=("value_score", "mean"),
+        avg_trust=("trust_score", "mean"),
+        avg_popularity=("popularity_score", "mean"),
+    ).reset_index().sort_values("product_count", ascending=False)
+
+
+# ---------- Review Intelligence ----------
+@timed()
+def sentiment_histogram(values, bins=20):
+    # (counts, edges), the same bins plt.hist(values, bins) would draw
+    return np.histogram(values.dropna(), bins=bins)
+
+
+# ---------- Recommendation Engine ----------
+def normalize(series):
+    if series.max() == series.min():
+        return pd.Series([0.5] * len(series), index=series.index)
+    return (series - series.min()) / (series.max() - series.min())
+
+
+@timed()
+def recommend(df, category="All", max_budget=None, min_rating=0.0, preference="Best overall", top_n=15, collapse=False):
+    data = df
+    if category != "All":
+        data = data[data["main_category"] == category]
+
+    mask = data["rating"] >= min_rating
+    if max_budget is not None:
+        mask &= data["discounted_price"] <= max_budget
+    data = data[mask].copy()
+
+    if len(data) == 0:
+        return data
+
+    weights = PREFERENCE_WEIGHTS[preference]
+    data["value_n"] = normalize(data["value_score"])
+    data["trust_n"] = normalize(data["trust_score"])
+    data["popularity_n"] = normalize(data["popularity_score"])
+    data["final_score"] = (
+        weights["trust"] * data["trust_n"]
+        + weights["value"] * data["value_n"]
+        + weights["popularity"] * data["popularity_n"]
+    )
+
+    data = data.sort_values("final_score", ascending=False)
+    if collapse and "listing_group_id" in data.columns:
+        data = collapse_listings(data)
+    return data.head(top_n)
+
+
+# ---------- Compare Products ----------
+def find_product(df, product_name):
+    # the first row with this name, as a one-row frame (empty when unknown)
+    return df[df["product_name"] == product_name].head(1)
+
+
+def overall_score(row):
+    return (
+        OVERALL_WEIGHTS["trust"] * row["trust_score"]
+        + OVERALL_WEIGHTS["value"] * row["value_score"]
+        + OVERALL_WEIGHTS["popularity"] * row["popularity_score"]
+    )
+
+
+def compare_winner(row_a, row_b):
+    # returns "A", "B" or None when both score the same
+    score_a, score_b = overall_score(row_a), overall_score(row_b)
+    if score_a > score_b:
+        return "A"
+    if score_b > score_a:
+        return "B"
+    return None
+
+
+# ---------- Deal Simulator ----------
+def safe_norm(x, minv, maxv):
+    if maxv == minv:
+        return 0.5
+    return (x - minv) / (maxv - minv)
+
+
+def simulate_deal(df, row, new_actual, new_discounted):
+    new_discount_pct = (1 - new_discounted / new_actual) * 100
+    new_discount_pct = max(0.0, min(100.0, new_discount_pct))
+
+    # We simulate using dataset scale to remain consistent
+    price_min, price_max = df["discounted_price"].min(), df["discounted_price"].max()
+    disc_min, disc_max = df["discount_percentage"].min(), df["discount_percentage"].max()
+
+    # price component: lower discounted price -> higher score
+    price_component = 1 - safe_norm(new_discounted, price_min, price_max)
+    # discount component: higher discount -> higher score
+    discount_component = safe_norm(new_discount_pct, disc_min, disc_max)
+
+    new_value_score = (VALUE_WEIGHTS["discount"] * discount_component + VALUE_WEIGHTS["price"] * price_component) * 100
+
+    # Decision / segment suggestion (rule-based)
+    trust = float(row["trust_score"])
+    pop = float(row["popularity_score"])
+
+    if new_value_score >= 80 and trust >= 70:
+        new_segment = "Best Deals (simulated)"
+    elif new_discount_pct >= 60 and trust < 40:
+        new_segment = "Discount Trap (simulated)"
+    elif trust >= 80 and pop < 25:
+        new_segment = "Hidden Gems (simulated)"
+    elif new_discounted > row["discounted_price"] * 1.2 and trust >= 70:
+        new_segment = "Premium Picks (simulated)"
+    else:
+        new_segment = "Balanced / Market"
+
+    return {
+        "new_discount_pct": float(new_discount_pct),
+        "new_value_score": float(new_value_score),
+        "trust_score": trust,
+        "popularity_score": pop,
+        "new_segment": new_segment,
+    }
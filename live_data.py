@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+import partitioned_store
+import query_cache
+import risk_analytics
+import snapshots
+from intelligence import dataset_version, default_data_path, load_products
+from profiling import timed
+from review_store import REVIEWS_PATH
+
+# The product frame the dashboard serves, hot-reloaded from snapshots.
+#
+# One LiveDataset per Streamlit process holds the current frame, shared by
+# every page and session (pages only read it). current() stats
+# snapshots.MANIFEST_PATH at most every POLL_SECONDS. When a new snapshot
+# has been published it starts loading it on a background thread and keeps
+# serving the old frame meanwhile, so nobody waits on a cold load. Once the
+# new frame is ready it is swapped in with a single assignment and the query
+# cache is cleared. Page caches keyed on the version (st.cache_data(version,
+# ...)) move over on their next call.
+#
+# The pages that read the partitioned store instead of the frame use
+# source(): the version and files being served, without loading the frame
+# when no page has needed it yet. Either way every page reads one snapshot.
+#
+# Without a manifest (outputs from before snapshots existed) the data file
+# itself is watched, as intelligence.dataset_version() sees it.
+#
+#   APP_RELOAD_POLL=2     seconds between manifest checks (0: every rerun)
+
+POLL_SECONDS = float(os.environ.get("APP_RELOAD_POLL", "2"))
+
+Dataset = namedtuple("Dataset", ["df", "version", "reviews_path", "partitions_path", "risk_rollup_path"])
+EMPTY = Dataset(None, None, None, None, None)
+
+
+def _stamp():
+    return snapshots.manifest_stamp() or dataset_version()
+
+
+def _source():
+    # (version, products path, reviews path, partitioned store, risk rollup) of the newest published data
+    manifest = snapshots.read_manifest()
+    if manifest is None:
+        partitions = partitioned_store.PARTITIONED_DIR if partitioned_store.available() else None
+        rollup = risk_analytics.RISK_ROLLUP_PATH if os.path.exists(risk_analytics.RISK_ROLLUP_PATH) else None
+        return dataset_version(), default_data_path(), REVIEWS_PATH, partitions, rollup
+    return (
+        manifest["version"],
+        snapshots.snapshot_path(manifest, "products"),
+        snapshots.snapshot_path(manifest, "reviews"),
+        snapshots.snapshot_path(manifest, "partitions"),
+        snapshots.snapshot_path(manifest, "risk_rollup"),
+    )
+
+
+@timed()
+def load_dataset():
+    version, products, reviews, partitions, rollup = _source()
+    df = load_products(products)
+    return EMPTY if df is None else Dataset(df, version, reviews, partitions, rollup)
+
+
+class LiveDataset:
+    def __init__(self, poll_seconds=POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._current = EMPTY
+        self._stamp = None
+        self._checked = 0.0
+        self._loader = None
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.error = None
+
+    def current(self):
+        if self._current.df is None:
+            # nothing to serve yet: the first request has to wait for the load
+            with self._lock:
+                if self._current.df is None:
+                    self._stamp = _stamp()
+                    self._current = load_dataset()
+            return self._current
+
+        now = time.monotonic()
+        if now - self._checked >= self.poll_seconds:
+            self._checked = now
+            self._poll()
+        return self._current
+
+    def source(self):
+        # version and files being served (df included once loaded); before any
+        # page needed the frame, those of the newest snapshot, without loading it
+        if self._current.df is not None:
+            return self.current()
+        version, _, reviews, partitions, rollup = _source()
+        return Dataset(None, version, reviews, partitions, rollup)
+
+    def _poll(self):
+        stamp = _stamp()
+        with self._lock:
+            if stamp == self._stamp or (self._loader is not None and self._loader.is_alive()):
+                return
+            # recorded up front, so a snapshot that fails to load is not retried on every rerun
+            self._stamp = stamp
+            self._loader = threading.Thread(target=self._reload, name="live-data-reload", daemon=True)
+            self._loader.start()
+
+    def _reload(self):
+        try:
+            data = load_dataset()
+        except Exception as e:  # keep serving the previous snapshot
+            self.error = f"{type(e).__name__}: {e}"
+            return
+        if data.df is None or data.version == self._current.version:
+            return
+        self._current = data
+        self.error = None
+        self.reloads += 1
+        query_cache.CACHE.clear()
+
+    def wait(self, timeout=None):
+        # block until a reload in progress has finished (scripts / tests)
+        loader = self._loader
+        if loader is not None:
+            loader.join(timeout)
+
+
+DATASET = LiveDataset()
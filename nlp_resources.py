@@ -0,0 +1,68 @@
+import argparse
+import os
+
+# NLTK data used by the batch scripts, checked locally instead of calling
+# nltk.download() on every run. Resources are looked up in the repo's
+# nltk_data/ directory first (vendored copy), then in NLTK's usual
+# locations (NLTK_DATA, ~/nltk_data, ...). Nothing is fetched unless asked:
+#
+#   python nlp_resources.py               # show what is installed
+#   python nlp_resources.py --download    # one-off download into ./nltk_data
+
+VENDOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nltk_data")
+
+# name -> path nltk.data.find() looks for
+RESOURCES = {
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+}
+
+
+def use_vendor_dir():
+    # nltk takes ~1.5 s to import, so it is only imported by the code that needs it
+    import nltk
+
+    if os.path.isdir(VENDOR_DIR) and VENDOR_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, VENDOR_DIR)
+    return nltk
+
+
+def missing(names=tuple(RESOURCES)):
+    nltk = use_vendor_dir()
+    absent = []
+    for name in names:
+        try:
+            nltk.data.find(RESOURCES[name])
+        except LookupError:
+            absent.append(name)
+    return absent
+
+
+def ensure(names=tuple(RESOURCES)):
+    absent = missing(names)
+    if absent:
+        raise SystemExit(
+            f"Missing NLTK data: {', '.join(absent)}. Run `python nlp_resources.py --download` once "
+            f"(needs network), or set NLTK_DATA to a directory that contains it."
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check or install the NLTK data used by the pipeline")
+    parser.add_argument("--download", action="store_true", help=f"download missing resources into {VENDOR_DIR}")
+    args = parser.parse_args()
+
+    absent = missing()
+    if absent and args.download:
+        nltk = use_vendor_dir()
+        for name in absent:
+            nltk.download(name, download_dir=VENDOR_DIR, quiet=True)
+        absent = missing()
+
+    for name in RESOURCES:
+        print(f"{name:<16} {'missing' if name in absent else 'ok'}")
+    if absent:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,47 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import os
+import profiling
+from profiling import span
+import sql_backend
+import partitioned_store
+import query_cache
+from intelligence import deal_badges, ranked_products
+from utils import load_data, timings_panel
 
 st.set_page_config(page_title="Product Explorer", page_icon="🔍", layout="wide")
+profiling.reset()
 st.title("🔍 Product Explorer")
 st.caption("Search, filter, and explore Amazon products with Value/Trust scoring + segments + NLP risk alerts.")
 
 # ---------- Load data ----------
-@st.cache_data
-def load_data():
-    file_path = "outputs/scored_segmented_products.csv"
-    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-        return None
-    return pd.read_csv(file_path)
+# with APP_BACKEND=sqlite the filters run as queries and only the shown rows are loaded;
+# with the current snapshot's partitioned store only the partitions / columns the filters need are read
+USE_SQL = sql_backend.enabled()
+USE_PARTITIONS = False
+
+# columns the cards, table and CSV export use
+COLUMNS = [
+    "product_id", "product_name", "main_category", "segment_name",
+    "discounted_price", "actual_price", "discount_percentage", "rating", "rating_count",
+    "value_score", "trust_score", "popularity_score", "sentiment_score", "risk_flag",
+    "mrp_outlier", "mrp_z", "listing_group_id",
+]
 
-df = load_data()
-if df is None:
-    st.error("❌ Data not found. Export outputs/scored_segmented_products.csv from notebook.")
-    st.stop()
+@st.cache_data(max_entries=32)
+def load_partitions(version, root, **pushdown):
+    return partitioned_store.read_products(COLUMNS, root=root, **pushdown)
 
-# ---------- Derived fields ----------
-df["main_category"] = df["category"].astype(str).apply(lambda x: x.split("|")[0])
+if USE_SQL:
+    df = None
+else:
+    with span("load_data"):
+        data = load_data(prefer_partitions=True)
+    df, version, partitions = data.df, data.version, data.partitions_path
+    USE_PARTITIONS = partitions is not None
+    if df is None and not USE_PARTITIONS:
+        st.error("❌ Data not found. Export outputs/scored_segmented_products.csv from notebook.")
+        st.stop()
 
 # ---------- UI Helpers ----------
 def segment_badge(segment):
@@ -55,26 +75,11 @@ def sentiment_emoji(score):
         return "😡 Negative"
     return "😐 Neutral"
 
-def get_badge(row):
-    # priority-based deal badges
-    if row["value_score"] >= 80 and row["trust_score"] >= 70:
-        return "🔥 Hot Deal"
-    if row["discount_percentage"] >= 60 and row["trust_score"] < 40:
-        return "⚠️ Discount Trap"
-    if row["trust_score"] >= 80 and row["popularity_score"] < 25:
-        return "💎 Hidden Gem"
-    if row["trust_score"] >= 85:
-        return "🏆 Top Rated"
-    if row["discount_percentage"] >= 50:
-        return "✅ Best Value"
-    return "—"
-
-df["deal_badge"] = df.apply(get_badge, axis=1)
-
 def product_card(row):
     seg = row.get("segment_name", "—")
     sentiment = row.get("sentiment_score", np.nan)
     risk = row.get("risk_flag", 0)
+    mrp_text = "🎈 MRP looks inflated vs similar products" if row.get("mrp_outlier", 0) == 1 else ""
 
     risk_text = "🚨 Risky keywords found in reviews" if risk == 1 else "✅ No risky keywords detected"
     sentiment_text = sentiment_emoji(sentiment)
@@ -105,6 +110,7 @@ def product_card(row):
             <div>💰 <b>₹{row['discounted_price']:.0f}</b></div>
             <div>🔻 <b>{row['discount_percentage']:.1f}%</b></div>
             <div>⭐ <b>{row['rating']:.2f}</b> ({int(row['rating_count']):,})</div>
+            <div style="color:#d97706; font-weight:700;">{mrp_text}</div>
         </div>
 
         <div style="display:flex; gap:10px; flex-wrap:wrap; margin-top:10px; font-size:13px;">
@@ -128,71 +134,134 @@ st.sidebar.header("🔎 Filters")
 
 search_query = st.sidebar.text_input("Search product name", "")
 
-category_list = ["All"] + sorted(df["main_category"].dropna().unique().tolist())
+@st.cache_data
+def sql_sidebar_options():
+    return {
+        "categories": sql_backend.distinct_values("main_category"),
+        "segments": sql_backend.distinct_values("segment_name"),
+        "price": sql_backend.value_range("discounted_price"),
+        "discount": sql_backend.value_range("discount_percentage"),
+        "rating": sql_backend.value_range("rating"),
+        "listing_groups": "listing_group_id" in sql_backend.columns(),
+        "mrp_outliers": "mrp_outlier" in sql_backend.columns(),
+    }
+
+@st.cache_data
+def partition_sidebar_options(version, root):
+    cols = partitioned_store.columns(root)
+    return {
+        "categories": partitioned_store.partition_values("main_category", root),
+        "segments": partitioned_store.partition_values("segment_name", root),
+        "price": partitioned_store.value_range("discounted_price", root),
+        "discount": partitioned_store.value_range("discount_percentage", root),
+        "rating": partitioned_store.value_range("rating", root),
+        "listing_groups": "listing_group_id" in cols,
+        "mrp_outliers": "mrp_outlier" in cols,
+    }
+
+if USE_SQL:
+    options = sql_sidebar_options()
+elif USE_PARTITIONS:
+    options = partition_sidebar_options(version, partitions)
+else:
+    options = {
+        "categories": sorted(df["main_category"].dropna().unique().tolist()),
+        "segments": sorted(df["segment_name"].dropna().unique().tolist()),
+        "price": (float(df["discounted_price"].min()), float(df["discounted_price"].max())),
+        "discount": (float(df["discount_percentage"].min()), float(df["discount_percentage"].max())),
+        "rating": (float(df["rating"].min()), float(df["rating"].max())),
+        "listing_groups": "listing_group_id" in df.columns,
+        "mrp_outliers": "mrp_outlier" in df.columns,
+    }
+
+category_list = ["All"] + options["categories"]
 selected_category = st.sidebar.selectbox("Category", category_list)
 
-segment_list = ["All"] + sorted(df["segment_name"].dropna().unique().tolist())
+segment_list = ["All"] + options["segments"]
 selected_segment = st.sidebar.selectbox("Segment", segment_list)
 
-min_price, max_price = float(df["discounted_price"].min()), float(df["discounted_price"].max())
+min_price, max_price = options["price"]
 price_range = st.sidebar.slider("Discounted Price Range", min_price, max_price, (min_price, max_price))
 
-min_discount, max_discount = float(df["discount_percentage"].min()), float(df["discount_percentage"].max())
+min_discount, max_discount = options["discount"]
 discount_range = st.sidebar.slider("Discount % Range", min_discount, max_discount, (min_discount, max_discount))
 
-min_rating, max_rating = float(df["rating"].min()), float(df["rating"].max())
+min_rating, max_rating = options["rating"]
 rating_range = st.sidebar.slider("Rating Range", min_rating, max_rating, (min_rating, max_rating))
 
 show_only_risky = st.sidebar.checkbox("Show only risky products 🚨", value=False)
 
+# MRP far above similar products' while the selling price is typical (see price_outliers.py)
+show_only_mrp_outliers = options["mrp_outliers"] and st.sidebar.checkbox(
+    "Show only inflated-MRP products 🎈", value=False,
+    help="Actual price (MRP) is a robust outlier within the product's (sub)category.",
+)
+
+# near-duplicate listings (same title in another colour / size) share a listing_group_id
+collapse = options["listing_groups"] and st.sidebar.checkbox(
+    "Collapse near-duplicate listings 🧬", value=False,
+    help="Keep only the best-ranked listing of each group of near-identical product names.",
+)
+
 max_cards = st.sidebar.slider("Cards to render (performance)", 0, 30, 10)
 
 limit = st.sidebar.slider("Rows to display (table)", 50, 5000, 500)
 
 # ---------- Apply Filters ----------
-filtered = df.copy()
-
-if search_query.strip():
-    filtered = filtered[filtered["product_name"].astype(str).str.contains(search_query, case=False, na=False)]
-
-if selected_category != "All":
-    filtered = filtered[filtered["main_category"] == selected_category]
-
-if selected_segment != "All":
-    filtered = filtered[filtered["segment_name"] == selected_segment]
-
-filtered = filtered[
-    (filtered["discounted_price"] >= price_range[0]) &
-    (filtered["discounted_price"] <= price_range[1]) &
-    (filtered["discount_percentage"] >= discount_range[0]) &
-    (filtered["discount_percentage"] <= discount_range[1]) &
-    (filtered["rating"] >= rating_range[0]) &
-    (filtered["rating"] <= rating_range[1])
-]
+filters = dict(
+    search_query=search_query,
+    category=selected_category,
+    segment=selected_segment,
+    price_range=price_range,
+    discount_range=discount_range,
+    rating_range=rating_range,
+    only_risky=show_only_risky,
+    only_mrp_outliers=show_only_mrp_outliers,
+    collapse=collapse,
+)
 
-if show_only_risky and "risk_flag" in filtered.columns:
-    filtered = filtered[filtered["risk_flag"] == 1]
+if USE_SQL:
+    # KPIs are aggregated in the database; only the top `limit` rows come back
+    summary = sql_backend.filter_summary(**filters)
+    filtered = sql_backend.filter_products(limit=limit, **filters)
+    n_filtered = int(summary["products"])
+    kpis = (summary["avg_rating"], summary["avg_discount"], summary["avg_trust"])
+else:
+    if USE_PARTITIONS:
+        # the name search and collapsing run on the loaded rows in filter_products
+        pushdown = {k: v for k, v in filters.items() if k not in ("search_query", "collapse")}
+        with span("load_partitions"):
+            df = load_partitions(version, partitions, **pushdown)
+    # repeated filter combinations come from the shared query cache (query_cache.py)
+    filtered = query_cache.cached(ranked_products, df, version, **filters)
+    n_filtered = len(filtered)
+    kpis = (filtered["rating"].mean(), filtered["discount_percentage"].mean(), filtered["trust_score"].mean())
+
+# rows are already in rank order (ORDER BY in SQL, ranked_products otherwise)
+filtered = filtered.assign(deal_badge=deal_badges(filtered))
+ranked = filtered
 
 # ---------- KPI Bar ----------
 k1, k2, k3, k4 = st.columns(4)
-k1.metric("Products", f"{len(filtered):,}")
-k2.metric("Avg Rating", f"{filtered['rating'].mean():.2f}" if len(filtered) else "—")
-k3.metric("Avg Discount %", f"{filtered['discount_percentage'].mean():.2f}%" if len(filtered) else "—")
-k4.metric("Avg Trust Score", f"{filtered['trust_score'].mean():.2f}" if len(filtered) else "—")
+k1.metric("Products", f"{n_filtered:,}")
+k2.metric("Avg Rating", f"{kpis[0]:.2f}" if n_filtered else "—")
+k3.metric("Avg Discount %", f"{kpis[1]:.2f}%" if n_filtered else "—")
+k4.metric("Avg Trust Score", f"{kpis[2]:.2f}" if n_filtered else "—")
 
 st.divider()
 
 # ---------- Cards view ----------
 st.subheader("✨ Top Products (Cards View)")
-top_cards = filtered.sort_values(["trust_score", "value_score"], ascending=False).head(max_cards)
+top_cards = ranked.head(max_cards)
 
-if max_cards == 0:
-    st.info("Cards disabled for performance. Enable from sidebar.")
-elif len(top_cards) == 0:
-    st.warning("No products found for your filters.")
-else:
-    for _, r in top_cards.iterrows():
-        st.markdown(product_card(r), unsafe_allow_html=True)
+with span("render_cards"):
+    if max_cards == 0:
+        st.info("Cards disabled for performance. Enable from sidebar.")
+    elif len(top_cards) == 0:
+        st.warning("No products found for your filters.")
+    else:
+        for _, r in top_cards.iterrows():
+            st.markdown(product_card(r), unsafe_allow_html=True)
 
 st.divider()
 
@@ -202,6 +271,7 @@ st.subheader("📋 Full Results (Table View)")
 display_cols = [
     "deal_badge",
     "product_name",
+    "listing_count",
     "main_category",
     "segment_name",
     "discounted_price",
@@ -213,18 +283,37 @@ display_cols = [
     "popularity_score",
     "sentiment_score",
     "risk_flag",
+    "mrp_outlier",
+    "mrp_z",
 ]
-display_cols = [c for c in display_cols if c in filtered.columns]
-
-st.dataframe(
-    filtered[display_cols].sort_values(["trust_score", "value_score"], ascending=False),
-    use_container_width=True,
-    height=520
-)
-
-st.download_button(
-    "⬇️ Download Filtered Data (CSV)",
-    data=filtered.to_csv(index=False).encode("utf-8"),
-    file_name="filtered_products.csv",
-    mime="text/csv"
-)
+display_cols = [c for c in display_cols if c in ranked.columns]
+
+if collapse:
+    st.caption("Near-duplicate listings collapsed: `listing_count` is the number of listings each row stands for.")
+if USE_SQL and n_filtered > len(ranked):
+    st.caption(f"Showing the top {len(ranked):,} of {n_filtered:,} matching products.")
+
+with span("render_table"):
+    st.dataframe(
+        ranked[display_cols],
+        use_container_width=True,
+        height=520
+    )
+
+with span("export_csv"):
+    export = filtered
+    if USE_SQL and n_filtered > len(filtered):
+        # only the top rows were loaded; every match is fetched once the export is asked for
+        export = None
+        if st.button(f"Prepare CSV of all {n_filtered:,} matching products"):
+            export = sql_backend.filter_products(**filters)
+            export = export.assign(deal_badge=deal_badges(export))
+    if export is not None:
+        st.download_button(
+            "⬇️ Download Filtered Data (CSV)",
+            data=export.to_csv(index=False).encode("utf-8"),
+            file_name="filtered_products.csv",
+            mime="text/csv"
+        )
+
+timings_panel()
@@ -1,28 +1,30 @@
 import streamlit as st
-import pandas as pd
-import os
-from utils import segment_badge, product_card
+from utils import segment_badge, product_card, price_trend, load_data, timings_panel
+import profiling
+from profiling import span
+from review_store import load_product_reviews
 
 st.set_page_config(page_title="Product Details", page_icon="📌", layout="wide")
+profiling.reset()
 st.title("📌 Product Details (Drill-down)")
 
 @st.cache_data
-def load_data():
-    file_path = "outputs/scored_segmented_products.csv"
-    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-        return None
-    return pd.read_csv(file_path)
+def load_reviews(path, offset, count):
+    return load_product_reviews(offset, count, path=path)
 
-df = load_data()
+with span("load_data"):
+    data = load_data()
+    df, reviews_path = data.df, data.reviews_path
 if df is None:
     st.error("❌ Data not found. Export outputs/scored_segmented_products.csv from notebook.")
     st.stop()
 
-df["main_category"] = df["category"].astype(str).apply(lambda x: x.split("|")[0])
-
 # Product selector
-product = st.selectbox("Select a product", sorted(df["product_name"].astype(str).unique().tolist()))
-row = df[df["product_name"] == product].iloc[0]
+with span("product_list"):
+    products = sorted(df["product_name"].astype(str).unique().tolist())
+product = st.selectbox("Select a product", products)
+with span("product_lookup"):
+    row = df[df["product_name"] == product].iloc[0]
 
 # Product Card Display
 st.markdown(product_card(row), unsafe_allow_html=True)
@@ -62,9 +64,27 @@ with right:
 
 st.divider()
 
+# Price / rating history (one snapshot appended per pipeline run)
+st.subheader("📈 Price & Rating Trend")
+with span("price_trend"):
+    price_trend(row)
+
+st.divider()
+
 # Reviews section (if columns exist)
 st.subheader("📝 Review Snippets")
-if "review_title" in df.columns or "review_content" in df.columns:
+if "review_offset" in df.columns and reviews_path is not None:
+    # review text lives in the review store and is only read for this product
+    with span("load_reviews"):
+        reviews = load_reviews(reviews_path, int(row["review_offset"]), int(row["review_count"]))
+
+    if len(reviews):
+        st.write(f"Showing {len(reviews)} review(s) for this product.")
+        review_cols = [c for c in ["review_title", "review_content", "sentiment_score", "risk_flag"] if c in reviews.columns]
+        st.dataframe(reviews[review_cols], use_container_width=True)
+    else:
+        st.info("No reviews stored for this product.")
+elif "review_title" in df.columns or "review_content" in df.columns:
     st.write("Showing review text available in dataset for this product (if present).")
 
     if "review_title" in df.columns:
@@ -76,3 +96,5 @@ if "review_title" in df.columns or "review_content" in df.columns:
         st.write(row.get("review_content", "—"))
 else:
     st.info("No review text columns found in dataset.")
+
+timings_panel()
@@ -1,24 +1,34 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import os
+import profiling
+from profiling import span
+import sql_backend
+import partitioned_store
+from intelligence import category_summary, dataset_version
+from utils import load_data, timings_panel
 
 st.set_page_config(page_title="Category Intelligence", page_icon="📊", layout="wide")
+profiling.reset()
 st.title("📊 Category Intelligence")
 
-@st.cache_data
-def load_data():
-    file_path = "outputs/scored_segmented_products.csv"
-    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-        return None
-    return pd.read_csv(file_path)
-
-df = load_data()
-if df is None:
-    st.error("❌ Data not found. Export outputs/scored_segmented_products.csv from notebook.")
-    st.stop()
+# with APP_BACKEND=sqlite the summary is read from the database; with the
+# current snapshot's partitioned store only the columns it aggregates are read
+USE_SQL = sql_backend.enabled()
+partitions = None
+SUMMARY_COLUMNS = [
+    "main_category", "product_id", "discount_percentage", "rating",
+    "value_score", "trust_score", "popularity_score",
+]
 
-df["main_category"] = df["category"].astype(str).apply(lambda x: x.split("|")[0])
+df = None
+if USE_SQL:
+    version = dataset_version(sql_backend.DB_PATH)
+else:
+    with span("load_data"):
+        data = load_data(prefer_partitions=True)
+    df, version, partitions = data.df, data.version, data.partitions_path
+    if data.df is None and partitions is None:
+        st.error("❌ Data not found. Export outputs/scored_segmented_products.csv from notebook.")
+        st.stop()
 
 st.markdown("""
 This page provides **category-level marketplace insights**, useful for:
@@ -27,15 +37,23 @@ This page provides **category-level marketplace insights**, useful for:
 - discount policy optimization
 """)
 
+# Chart data is computed once per dataset version; slider moves only slice it
+# (_df is the frame of that version, not hashed)
+@st.cache_data
+def chart_data(version, use_sql, partitions, _df):
+    if use_sql:
+        return sql_backend.category_summary()
+    if partitions is not None:
+        return category_summary(partitioned_store.read_products(SUMMARY_COLUMNS, root=partitions))
+    return category_summary(_df)
+
+@st.cache_data
+def top_categories(version, use_sql, partitions, topn, _df):
+    return chart_data(version, use_sql, partitions, _df).head(topn)[["main_category", "product_count"]]
+
 # Category KPIs
-cat_summary = df.groupby("main_category").agg(
-    product_count=("product_id", "count"),
-    avg_discount=("discount_percentage", "mean"),
-    avg_rating=("rating", "mean"),
-    avg_value=("value_score", "mean"),
-    avg_trust=("trust_score", "mean"),
-    avg_popularity=("popularity_score", "mean"),
-).reset_index().sort_values("product_count", ascending=False)
+with span("category_summary"):
+    cat_summary = chart_data(version, USE_SQL, partitions, df)
 
 st.subheader("📌 Category Performance Table")
 st.dataframe(cat_summary, use_container_width=True, height=520)
@@ -46,11 +64,14 @@ st.divider()
 st.subheader("📈 Top Categories by Product Count")
 topn = st.slider("Top N categories", 5, 30, 10)
 
-top = cat_summary.head(topn)
+with span("render_chart"):
+    st.bar_chart(
+        top_categories(version, USE_SQL, partitions, topn, df),
+        x="main_category",
+        y="product_count",
+        x_label="Category",
+        y_label="Product Count",
+        sort="-product_count",
+    )
 
-fig = plt.figure()
-plt.bar(top["main_category"], top["product_count"])
-plt.xticks(rotation=40, ha="right")
-plt.xlabel("Category")
-plt.ylabel("Product Count")
-st.pyplot(fig)
+timings_panel()
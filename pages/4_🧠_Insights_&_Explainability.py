@@ -1,48 +1,43 @@
 import streamlit as st
-import pandas as pd
-import os
+import profiling
+from profiling import span
+from utils import load_data, timings_panel
 
 st.set_page_config(page_title="Insights & Explainability", page_icon="🧠", layout="wide")
+profiling.reset()
 st.title("🧠 Insights & Explainability")
 
-@st.cache_data
-def load_data():
-    file_path = "outputs/scored_segmented_products.csv"
-    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-        return None
-    return pd.read_csv(file_path)
-
-df = load_data()
+with span("load_data"):
+    df = load_data().df
 if df is None:
     st.error("❌ Data not found. Export outputs/scored_segmented_products.csv from notebook.")
     st.stop()
 
-df["main_category"] = df["category"].astype(str).apply(lambda x: x.split("|")[0])
-
 # ---------------- Auto Insights ----------------
 st.subheader("📌 Auto-Generated Insights")
 
-insights = []
+with span("insights"):
+    insights = []
 
-# insight: highest avg discount category
-tmp = df.groupby("main_category")["discount_percentage"].mean().sort_values(ascending=False)
-if len(tmp):
-    insights.append(f"🔻 Highest average discount category: **{tmp.index[0]}** ({tmp.iloc[0]:.1f}%).")
+    # insight: highest avg discount category
+    tmp = df.groupby("main_category")["discount_percentage"].mean().sort_values(ascending=False)
+    if len(tmp):
+        insights.append(f"🔻 Highest average discount category: **{tmp.index[0]}** ({tmp.iloc[0]:.1f}%).")
 
-# insight: most trusted category
-tmp = df.groupby("main_category")["trust_score"].mean().sort_values(ascending=False)
-if len(tmp):
-    insights.append(f"✅ Most trusted category: **{tmp.index[0]}** (Avg trust {tmp.iloc[0]:.1f}).")
+    # insight: most trusted category
+    tmp = df.groupby("main_category")["trust_score"].mean().sort_values(ascending=False)
+    if len(tmp):
+        insights.append(f"✅ Most trusted category: **{tmp.index[0]}** (Avg trust {tmp.iloc[0]:.1f}).")
 
-# insight: discount traps size
-if "segment_name" in df.columns:
-    trap_count = (df["segment_name"] == "Discount Trap").sum()
-    insights.append(f"⚠️ Products flagged as Discount Trap: **{trap_count:,}**.")
+    # insight: discount traps size
+    if "segment_name" in df.columns:
+        trap_count = (df["segment_name"] == "Discount Trap").sum()
+        insights.append(f"⚠️ Products flagged as Discount Trap: **{trap_count:,}**.")
 
-# insight: best deals size
-if "segment_name" in df.columns:
-    best_count = (df["segment_name"] == "Best Deals").sum()
-    insights.append(f"🔥 Products in Best Deals segment: **{best_count:,}**.")
+    # insight: best deals size
+    if "segment_name" in df.columns:
+        best_count = (df["segment_name"] == "Best Deals").sum()
+        insights.append(f"🔥 Products in Best Deals segment: **{best_count:,}**.")
 
 for i in insights:
     st.write(i)
@@ -86,3 +81,5 @@ Higher rating_count generally means:
 """)
 
 st.info("This transparency improves dashboard credibility and makes the project more interview-ready.")
+
+timings_panel()
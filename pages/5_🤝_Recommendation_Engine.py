@@ -1,39 +1,81 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import os
+import profiling
+from profiling import span
+import sql_backend
+import partitioned_store
+import query_cache
+from intelligence import recommend
+from utils import load_data, timings_panel
 
 st.set_page_config(page_title="Recommendation Engine", page_icon="🤝", layout="wide")
+profiling.reset()
 st.title("🤝 Recommendation Engine")
 st.caption("Personalized product recommendations based on budget, category, rating, and trust/value preferences.")
 
+# with APP_BACKEND=sqlite the filter, scoring and top-N run as one query;
+# with the current snapshot's partitioned store only the chosen category's rows within budget are read
+USE_SQL = sql_backend.enabled()
+USE_PARTITIONS = False
+
+COLUMNS = [
+    "product_id", "product_name", "main_category", "segment_name",
+    "discounted_price", "discount_percentage", "rating", "rating_count",
+    "value_score", "trust_score", "popularity_score", "listing_group_id",
+]
+
+@st.cache_data(max_entries=32)
+def load_partitions(version, root, category, max_budget, min_rating):
+    return partitioned_store.read_products(
+        COLUMNS, root=root, category=category,
+        price_range=(float("-inf"), max_budget), rating_range=(min_rating, float("inf")),
+    )
+
 @st.cache_data
-def load_data():
-    file_path = "outputs/scored_segmented_products.csv"
-    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-        return None
-    return pd.read_csv(file_path)
-
-df = load_data()
-if df is None:
-    st.error("❌ Data not found. Export outputs/scored_segmented_products.csv from notebook.")
-    st.stop()
+def sql_sidebar_options():
+    return (
+        sql_backend.distinct_values("main_category"),
+        sql_backend.value_range("discounted_price")[1],
+        "listing_group_id" in sql_backend.columns(),
+    )
 
-df["main_category"] = df["category"].astype(str).apply(lambda x: x.split("|")[0])
+@st.cache_data
+def partition_sidebar_options(version, root):
+    return (
+        partitioned_store.partition_values("main_category", root),
+        partitioned_store.value_range("discounted_price", root)[1],
+        "listing_group_id" in partitioned_store.columns(root),
+    )
+
+if not USE_SQL:
+    with span("load_data"):
+        data = load_data(prefer_partitions=True)
+    df, version, partitions = data.df, data.version, data.partitions_path
+    USE_PARTITIONS = partitions is not None
+    if df is None and not USE_PARTITIONS:
+        st.error("❌ Data not found. Export outputs/scored_segmented_products.csv from notebook.")
+        st.stop()
+
+if USE_SQL:
+    categories, max_price, has_groups = sql_sidebar_options()
+elif USE_PARTITIONS:
+    categories, max_price, has_groups = partition_sidebar_options(version, partitions)
+else:
+    categories, max_price = sorted(df["main_category"].dropna().unique().tolist()), df["discounted_price"].max()
+    has_groups = "listing_group_id" in df.columns
 
 # ---------------------
 # User Inputs
 # ---------------------
 st.sidebar.header("🎛 Recommendation Settings")
 
-category_list = ["All"] + sorted(df["main_category"].dropna().unique().tolist())
+category_list = ["All"] + categories
 selected_category = st.sidebar.selectbox("Category", category_list)
 
 max_budget = st.sidebar.number_input(
     "Max Budget (₹)", 
     min_value=0, 
-    max_value=int(df["discounted_price"].max()),
-    value=min(2000, int(df["discounted_price"].max()))
+    max_value=int(max_price),
+    value=min(2000, int(max_price))
 )
 
 min_rating = st.sidebar.slider("Minimum Rating", 1.0, 5.0, 3.5, 0.1)
@@ -45,55 +87,41 @@ preference = st.sidebar.radio(
 
 top_n = st.sidebar.slider("How many recommendations?", 5, 50, 15)
 
+collapse = has_groups and st.sidebar.checkbox(
+    "One pick per near-duplicate group 🧬", value=True,
+    help="Skip other colours / sizes of a product that is already recommended.",
+)
+
 # ---------------------
-# Filtering
+# Filtering + ranking logic (RULE-BASED RECOMMENDER)
 # ---------------------
-data = df.copy()
-
-if selected_category != "All":
-    data = data[data["main_category"] == selected_category]
-
-data = data[
-    (data["discounted_price"] <= max_budget) &
-    (data["rating"] >= min_rating)
-].copy()
-
-if len(data) == 0:
+settings = dict(
+    category=selected_category,
+    max_budget=max_budget,
+    min_rating=min_rating,
+    preference=preference,
+    top_n=top_n,
+    collapse=collapse,
+)
+if USE_SQL:
+    recommendations = sql_backend.recommend(**settings)
+else:
+    if USE_PARTITIONS:
+        with span("load_partitions"):
+            df = load_partitions(version, partitions, selected_category, max_budget, min_rating)
+    recommendations = query_cache.cached(recommend, df, version, **settings)
+
+if len(recommendations) == 0:
     st.warning("No products match your filters. Increase budget or lower minimum rating.")
     st.stop()
 
-# ---------------------
-# Ranking logic (RULE-BASED RECOMMENDER)
-# ---------------------
-# Normalize to combine fairly
-def normalize(series):
-    if series.max() == series.min():
-        return pd.Series([0.5] * len(series), index=series.index)
-    return (series - series.min()) / (series.max() - series.min())
-
-data["value_n"] = normalize(data["value_score"])
-data["trust_n"] = normalize(data["trust_score"])
-data["popularity_n"] = normalize(data["popularity_score"])
-
-if preference == "Best overall":
-    # strongest recommender formula
-    data["final_score"] = 0.45 * data["trust_n"] + 0.35 * data["value_n"] + 0.20 * data["popularity_n"]
-elif preference == "Best value (discount)":
-    data["final_score"] = 0.60 * data["value_n"] + 0.25 * data["trust_n"] + 0.15 * data["popularity_n"]
-elif preference == "Most trusted":
-    data["final_score"] = 0.70 * data["trust_n"] + 0.20 * data["value_n"] + 0.10 * data["popularity_n"]
-else:  # Most popular
-    data["final_score"] = 0.70 * data["popularity_n"] + 0.20 * data["trust_n"] + 0.10 * data["value_n"]
-
-recommendations = data.sort_values("final_score", ascending=False).head(top_n)
-
 # ---------------------
 # Display
 # ---------------------
 st.subheader("✅ Recommended Products")
 
 cols = [
-    "product_name", "main_category",
+    "product_name", "listing_count", "main_category",
     "discounted_price", "discount_percentage",
     "rating", "rating_count",
     "value_score", "trust_score", "popularity_score",
@@ -101,7 +129,8 @@ cols = [
 ]
 cols = [c for c in cols if c in recommendations.columns]
 
-st.dataframe(recommendations[cols], use_container_width=True, height=520)
+with span("render_table"):
+    st.dataframe(recommendations[cols], use_container_width=True, height=520)
 
 st.download_button(
     "⬇️ Download Recommendations CSV",
@@ -109,3 +138,5 @@ st.download_button(
     file_name="recommended_products.csv",
     mime="text/csv"
 )
+
+timings_panel()
@@ -1,52 +1,77 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import os
+import profiling
+from profiling import span
+import risk_analytics
+import sql_backend
+from intelligence import dataset_version, sentiment_histogram
+from review_store import REVIEWS_PATH, review_titles
+from utils import load_data, timings_panel
 
 st.set_page_config(page_title="Review Intelligence", page_icon="🧾", layout="wide")
+profiling.reset()
 st.title("🧾 Review Intelligence (NLP)")
 st.caption("Sentiment + risky keyword detection from customer reviews")
 
-@st.cache_data
-def load_data():
-    file_path = "outputs/scored_segmented_products.csv"
-    if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
-        return None
-    return pd.read_csv(file_path)
-
-df = load_data()
-if df is None:
-    st.error("❌ Data not found.")
-    st.stop()
+# with APP_BACKEND=sqlite KPIs, histogram and top-50 are computed in the database
+USE_SQL = sql_backend.enabled()
+
+if USE_SQL:
+    available = sql_backend.columns()
+    version, reviews_path = dataset_version(sql_backend.DB_PATH), REVIEWS_PATH
+    # the database is not snapshotted; the rollup pipeline.py wrote beside it goes with it
+    rollup_path = risk_analytics.RISK_ROLLUP_PATH
+    rollup_version = dataset_version(rollup_path) or version
+else:
+    with span("load_data"):
+        data = load_data()
+        df, version, reviews_path = data.df, data.version, data.reviews_path
+        rollup_path, rollup_version = data.risk_rollup_path, version
+    if df is None:
+        st.error("❌ Data not found.")
+        st.stop()
+    available = df.columns
 
-if "sentiment_score" not in df.columns or "risk_flag" not in df.columns:
+if "sentiment_score" not in available or "risk_flag" not in available:
     st.error("❌ NLP columns not found. Please run notebook NLP step and export again.")
     st.stop()
 
-df["main_category"] = df["category"].astype(str).apply(lambda x: x.split("|")[0])
+# KPIs and histogram bins are computed once per dataset version (_df is its frame, not hashed)
+@st.cache_data
+def review_stats(version, use_sql, _df, bins=20):
+    if use_sql:
+        summary = sql_backend.review_summary()
+        counts, edges = sql_backend.sentiment_histogram(bins=bins)
+    else:
+        data = _df
+        summary = {
+            "avg_sentiment": data["sentiment_score"].mean(),
+            "risk_count": data["risk_flag"].sum(),
+            "risk_rate": data["risk_flag"].mean(),
+        }
+        counts, edges = sentiment_histogram(data["sentiment_score"], bins=bins)
+    # one bar per bin, labelled by its centre
+    hist = pd.DataFrame({"sentiment": ((edges[:-1] + edges[1:]) / 2).round(2), "count": counts})
+    return summary, hist
+
+summary, hist = review_stats(version, USE_SQL, None if USE_SQL else df)
 
-# KPIs
 c1, c2, c3 = st.columns(3)
-c1.metric("Avg Sentiment Score", f"{df['sentiment_score'].mean():.2f}")
-c2.metric("Risk Flag Count", f"{int(df['risk_flag'].sum()):,}")
-c3.metric("Risk %", f"{(df['risk_flag'].mean()*100):.2f}%")
+c1.metric("Avg Sentiment Score", f"{summary['avg_sentiment']:.2f}")
+c2.metric("Risk Flag Count", f"{int(summary['risk_count']):,}")
+c3.metric("Risk %", f"{(summary['risk_rate']*100):.2f}%")
 
 st.divider()
 
 # Sentiment distribution
 st.subheader("📊 Sentiment Distribution")
-fig = plt.figure()
-plt.hist(df["sentiment_score"].dropna(), bins=20)
-plt.xlabel("Sentiment (VADER compound)")
-plt.ylabel("Count")
-st.pyplot(fig)
+with span("render_histogram"):
+    st.bar_chart(hist, x="sentiment", y="count", x_label="Sentiment (VADER compound)", y_label="Count")
 
 st.divider()
 
 # Risky products table
 st.subheader("🚨 High Risk Products (keyword flagged)")
-risky = df[df["risk_flag"] == 1].copy()
-
 cols = [
     "product_name", "main_category", "segment_name",
     "discounted_price", "discount_percentage",
@@ -54,10 +79,71 @@ cols = [
     "sentiment_score", "risk_flag",
     "review_title"
 ]
-cols = [c for c in cols if c in risky.columns]
+
+with span("risky_products"):
+    if USE_SQL:
+        fetch = [c for c in cols + ["review_offset", "review_count"] if c in available]
+        top_risky = sql_backend.top_risky(fetch, n=50)
+    else:
+        top_risky = risk_analytics.top_risky(df, n=50)
+
+# titles come from the review store when the slim product frame is loaded
+if "review_title" not in top_risky.columns and "review_offset" in top_risky.columns:
+    with span("load_review_titles"):
+        top_risky["review_title"] = review_titles(top_risky, path=reviews_path)
+
+cols = [c for c in cols if c in top_risky.columns]
 
 st.dataframe(
-    risky.sort_values(["sentiment_score", "trust_score"], ascending=True)[cols].head(50),
+    top_risky[cols],
     use_container_width=True,
     height=520
 )
+
+st.divider()
+
+# ---------- Risk rollups (category x segment) ----------
+@st.cache_data
+def load_rollup(version, use_sql, path, _df):
+    # precomputed by pipeline.py and published with the snapshot; without it, rates
+    # (but not keyword counts) are rolled up from the product frame of the same version
+    rollup = risk_analytics.load_rollup(path) if path else None
+    if rollup is None and not use_sql:
+        rollup = risk_analytics.risk_rollup(_df)
+    return rollup
+
+with span("risk_rollup"):
+    rollup = load_rollup(rollup_version, USE_SQL, rollup_path, None if USE_SQL else df)
+
+st.subheader("🧮 Risk by Category × Segment")
+if rollup is None:
+    st.info("Run `python pipeline.py` to build the risk rollups.")
+    timings_panel()
+    st.stop()
+
+measures = {"Risk rate (%)": "risk_rate", "Mean sentiment": "mean_sentiment", "Risky products": "risky_products"}
+measure = st.radio("Measure", list(measures), horizontal=True)
+matrix = risk_analytics.risk_matrix(rollup, measures[measure])
+if measures[measure] == "risk_rate":
+    matrix = matrix * 100
+st.dataframe(matrix.round(2), use_container_width=True)
+
+st.subheader("🔎 Complaint Keyword Drill-down")
+keywords = risk_analytics.keywords_in(rollup)
+if not keywords:
+    st.info("Keyword counts come from the review store; run `python pipeline.py` to enable the drill-down.")
+else:
+    k1, k2 = st.columns([3, 1])
+    selected = k1.multiselect("Complaint keywords", keywords, default=[k for k in ["fake", "duplicate"] if k in keywords])
+    group_by = k2.radio("Group by", ["Category", "Segment"])
+
+    if selected:
+        drill = risk_analytics.keyword_drilldown(
+            rollup, selected, by="main_category" if group_by == "Category" else "segment_name"
+        )
+        label = drill.columns[0]
+        st.caption(f"Reviews mentioning {' / '.join(repr(k) for k in selected)}, by {group_by.lower()}")
+        st.bar_chart(drill.head(15), x=label, y="mentions", sort="-mentions")
+        st.dataframe(drill, use_container_width=True)
+
+timings_panel()
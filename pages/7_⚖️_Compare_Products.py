@@ -1,28 +1,25 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import os
+import profiling
+from profiling import span
+import query_cache
+from intelligence import compare_winner, find_product
+from utils import load_data, timings_panel
 
 st.set_page_config(page_title="Compare Products", page_icon="⚖️", layout="wide")
+profiling.reset()
 st.title("⚖️ Compare Two Products")
 st.caption("Side-by-side comparison using pricing, discount, ratings and your intelligence scores.")
 
-@st.cache_data
-def load_data():
-    fp = "outputs/scored_segmented_products.csv"
-    if not os.path.exists(fp) or os.path.getsize(fp) == 0:
-        return None
-    return pd.read_csv(fp)
-
-df = load_data()
+with span("load_data"):
+    data = load_data()
+    df, version = data.df, data.version
 if df is None:
     st.error("❌ Data not found.")
     st.stop()
 
-df["main_category"] = df["category"].astype(str).apply(lambda x: x.split("|")[0])
-
 # Select products
-products = sorted(df["product_name"].astype(str).unique().tolist())
+with span("product_list"):
+    products = sorted(df["product_name"].astype(str).unique().tolist())
 
 colA, colB = st.columns(2)
 with colA:
@@ -30,8 +27,9 @@ with colA:
 with colB:
     p2 = st.selectbox("Choose Product B", products, index=min(1, len(products)-1))
 
-row1 = df[df["product_name"] == p1].iloc[0]
-row2 = df[df["product_name"] == p2].iloc[0]
+with span("product_lookup"):
+    row1 = query_cache.cached(find_product, df, version, product_name=p1).iloc[0]
+    row2 = query_cache.cached(find_product, df, version, product_name=p2).iloc[0]
 
 def metric_block(title, row):
     st.subheader(title)
@@ -71,12 +69,13 @@ with right:
 st.divider()
 st.subheader("🏆 Winner Suggestion")
 
-scoreA = 0.45*row1["trust_score"] + 0.35*row1["value_score"] + 0.20*row1["popularity_score"]
-scoreB = 0.45*row2["trust_score"] + 0.35*row2["value_score"] + 0.20*row2["popularity_score"]
+winner = compare_winner(row1, row2)
 
-if scoreA > scoreB:
+if winner == "A":
     st.success(f"✅ Recommended: **{p1}** (higher overall intelligence score)")
-elif scoreB > scoreA:
+elif winner == "B":
     st.success(f"✅ Recommended: **{p2}** (higher overall intelligence score)")
 else:
     st.info("Both products score similarly. Prefer the one with higher Trust Score.")
+
+timings_panel()
@@ -1,33 +1,29 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import os
+import profiling
+from profiling import span
+from intelligence import simulate_deal
+from utils import load_data, price_trend, timings_panel
 
 st.set_page_config(page_title="Deal Simulator", page_icon="🧪", layout="wide")
+profiling.reset()
 st.title("🧪 Deal Simulator (What-if Analysis)")
 st.caption("Simulate price & discount changes and see how Value Score and segment recommendation change.")
 
-@st.cache_data
-def load_data():
-    fp = "outputs/scored_segmented_products.csv"
-    if not os.path.exists(fp) or os.path.getsize(fp) == 0:
-        return None
-    return pd.read_csv(fp)
-
-df = load_data()
+with span("load_data"):
+    df = load_data().df
 if df is None:
     st.error("❌ Data not found.")
     st.stop()
 
-df["main_category"] = df["category"].astype(str).apply(lambda x: x.split("|")[0])
-
 # ------------------
 # Select product
 # ------------------
-products = sorted(df["product_name"].astype(str).unique().tolist())
+with span("product_list"):
+    products = sorted(df["product_name"].astype(str).unique().tolist())
 product = st.selectbox("Select a product to simulate", products)
 
-row = df[df["product_name"] == product].iloc[0]
+with span("product_lookup"):
+    row = df[df["product_name"] == product].iloc[0]
 
 st.subheader("Original Product")
 c1, c2, c3, c4 = st.columns(4)
@@ -37,6 +33,11 @@ c3.metric("Discount %", f"{row['discount_percentage']:.1f}%")
 c4.metric("Value Score", f"{row['value_score']:.1f}")
 
 st.write(f"**Segment:** {row.get('segment_name','—')}")
+
+with st.expander("📈 Price history"):
+    with span("price_trend"):
+        price_trend(row)
+
 st.divider()
 
 # ------------------
@@ -50,45 +51,16 @@ new_discounted = st.number_input("New Discounted Price (₹)", min_value=1.0, va
 if new_actual <= 0 or new_discounted <= 0:
     st.stop()
 
-new_discount_pct = (1 - new_discounted / new_actual) * 100
-new_discount_pct = max(0.0, min(100.0, new_discount_pct))
-
-# ------------------
-# Recompute Value Score (same method as notebook)
-# ------------------
-# We simulate using dataset scale to remain consistent
-price_min, price_max = df["discounted_price"].min(), df["discounted_price"].max()
-disc_min, disc_max = df["discount_percentage"].min(), df["discount_percentage"].max()
-
-def safe_norm(x, minv, maxv):
-    if maxv == minv:
-        return 0.5
-    return (x - minv) / (maxv - minv)
-
-# price component: lower discounted price -> higher score
-price_component = 1 - safe_norm(new_discounted, price_min, price_max)
-
-# discount component: higher discount -> higher score
-discount_component = safe_norm(new_discount_pct, disc_min, disc_max)
-
-new_value_score = (0.6 * discount_component + 0.4 * price_component) * 100
-
 # ------------------
-# Decision / segment suggestion (rule-based)
+# Recompute Value Score (same method as notebook) + segment suggestion
 # ------------------
-trust = float(row["trust_score"])
-pop = float(row["popularity_score"])
-
-if new_value_score >= 80 and trust >= 70:
-    new_segment = "Best Deals (simulated)"
-elif new_discount_pct >= 60 and trust < 40:
-    new_segment = "Discount Trap (simulated)"
-elif trust >= 80 and pop < 25:
-    new_segment = "Hidden Gems (simulated)"
-elif new_discounted > row["discounted_price"] * 1.2 and trust >= 70:
-    new_segment = "Premium Picks (simulated)"
-else:
-    new_segment = "Balanced / Market"
+with span("simulate_deal"):
+    sim = simulate_deal(df, row, new_actual, new_discounted)
+new_discount_pct = sim["new_discount_pct"]
+new_value_score = sim["new_value_score"]
+new_segment = sim["new_segment"]
+trust = sim["trust_score"]
+pop = sim["popularity_score"]
 
 # ------------------
 # Show results
@@ -108,3 +80,5 @@ elif new_value_score < row["value_score"]:
     st.warning(f"📉 Deal weakened. New recommended segment: **{new_segment}**")
 else:
     st.info(f"Deal quality unchanged. New recommended segment: **{new_segment}**")
+
+timings_panel()
@@ -0,0 +1,140 @@
+import streamlit as st
+import pandas as pd
+import profiling
+from profiling import span
+import rescoring
+from utils import load_data, timings_panel
+
+st.set_page_config(page_title="Score Tuning", page_icon="🎚️", layout="wide")
+profiling.reset()
+st.title("🎚️ Score Tuning")
+st.caption("Tune the Value / Trust / overall score weights for the whole catalog or per category and see it re-scored instantly.")
+
+with span("load_data"):
+    data = load_data()
+    df, version = data.df, data.version
+if df is None:
+    st.error("❌ Data not found.")
+    st.stop()
+
+@st.cache_data
+def category_options(version, _df):
+    return sorted(_df["main_category"].dropna().unique().tolist())
+
+# ---------- Sidebar: weights ----------
+# catalog-wide weights plus per-category overrides, kept for the session
+defaults = rescoring.DEFAULT_WEIGHTS
+base_weights = st.session_state.setdefault("tuning_weights", dict(defaults))
+category_weights = st.session_state.setdefault("tuning_category_weights", {})
+st.sidebar.header("🎚️ Weights")
+
+selected_category = st.sidebar.selectbox("Category", ["All"] + category_options(version, df))
+own = selected_category != "All" and st.sidebar.checkbox(
+    f"Own weights for {selected_category}",
+    value=selected_category in category_weights,
+    key=f"own_{selected_category}",
+    help="Off: this category uses the catalog-wide weights.",
+)
+scope = selected_category if own else "All"
+current = category_weights.get(selected_category, base_weights) if own else base_weights
+
+st.sidebar.subheader("🎯 Value Score")
+discount_weight = st.sidebar.slider(
+    "Discount vs price", 0.0, 1.0, current["discount"], 0.05, key=f"discount_{scope}",
+    help="Share of the discount component; the rest goes to the (low) discounted price.",
+)
+
+st.sidebar.subheader("🛡 Trust Score")
+m_quantile = st.sidebar.slider(
+    "Rating-count prior (percentile)", 0.05, 0.95, current["m_quantile"], 0.05, key=f"m_quantile_{scope}",
+    help="Ratings are pulled towards the catalog mean by the rating count at this percentile.",
+)
+
+st.sidebar.subheader("🏅 Overall Score")
+trust_weight = st.sidebar.slider("Trust", 0.0, 1.0, current["trust"], 0.05, key=f"trust_{scope}")
+value_weight = st.sidebar.slider("Value", 0.0, 1.0, current["value"], 0.05, key=f"value_{scope}")
+popularity_weight = st.sidebar.slider("Popularity", 0.0, 1.0, current["popularity"], 0.05, key=f"popularity_{scope}")
+
+weights = dict(
+    discount=discount_weight,
+    price=1 - discount_weight,
+    m_quantile=m_quantile,
+    trust=trust_weight,
+    value=value_weight,
+    popularity=popularity_weight,
+)
+if own:
+    category_weights[selected_category] = weights
+else:
+    base_weights.update(weights)
+    if selected_category != "All":
+        category_weights.pop(selected_category, None)
+
+if category_weights:
+    st.sidebar.caption("Own weights: " + ", ".join(sorted(category_weights)))
+    if st.sidebar.button("↩️ Clear category weights"):
+        category_weights.clear()
+        st.rerun()
+
+top_n = st.sidebar.slider("Products to show", 10, 200, 25)
+
+# ---------- Re-score ----------
+# the whole catalog, memoized per weight set and category overrides (see rescoring.py)
+with span("rescore"):
+    tuned = rescoring.rescore(df, version, category_weights=category_weights, **base_weights)
+    stored = rescoring.rescore(df, version)
+
+mask = (df["main_category"] == selected_category) if selected_category != "All" else pd.Series(True, index=df.index)
+applied = rescoring.normalize_weights(**weights)
+st.caption(
+    f"{'Catalog-wide' if scope == 'All' else scope} · "
+    f"Value = {applied['discount']:.2f} × discount + {applied['price']:.2f} × price · "
+    f"m = rating count at the {applied['m_quantile']:.0%} percentile · "
+    f"Overall = {applied['trust']:.2f} × trust + {applied['value']:.2f} × value + {applied['popularity']:.2f} × popularity"
+)
+
+# ---------- KPIs ----------
+with span("kpis"):
+    changed = (tuned["deal_badge"] != stored["deal_badge"])[mask]
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Products", f"{int(mask.sum()):,}")
+    k2.metric("Avg Value Score", f"{tuned['value_score'][mask].mean():.1f}",
+              f"{tuned['value_score'][mask].mean() - stored['value_score'][mask].mean():+.1f}")
+    k3.metric("Avg Trust Score", f"{tuned['trust_score'][mask].mean():.1f}",
+              f"{tuned['trust_score'][mask].mean() - stored['trust_score'][mask].mean():+.1f}")
+    k4.metric("Badges changed", f"{int(changed.sum()):,}")
+
+st.divider()
+
+# ---------- Top products ----------
+st.subheader("🏆 Top Products Under These Weights")
+with span("top_products"):
+    top = tuned[mask].nlargest(top_n, "overall_score")
+    table = df.loc[top.index, ["product_name", "main_category", "discounted_price", "discount_percentage", "rating", "rating_count"]]
+    table = table.assign(
+        overall_score=top["overall_score"],
+        overall_before=stored["overall_score"].reindex(top.index),
+        value_score=top["value_score"],
+        value_before=stored["value_score"].reindex(top.index),
+        trust_score=top["trust_score"],
+        trust_before=stored["trust_score"].reindex(top.index),
+        deal_badge=top["deal_badge"],
+    )
+    st.dataframe(table, use_container_width=True, height=520)
+
+# ---------- Badge mix ----------
+st.subheader("🏷️ Deal Badge Mix")
+with span("badge_mix"):
+    mix = pd.DataFrame({
+        "default weights": stored["deal_badge"][mask].value_counts(sort=False),
+        "tuned weights": tuned["deal_badge"][mask].value_counts(sort=False),
+    })
+    st.bar_chart(mix, stack=False)
+
+c = rescoring.CACHE.stats()
+st.caption(
+    f"🗃️ {c['entries']} weight set(s) memoized, {c['mb']:.1f} / {c['max_mb']:.0f} MB, "
+    f"hit rate {c['hit_rate'] or 0:.0%}"
+)
+
+timings_panel()
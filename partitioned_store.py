@@ -0,0 +1,219 @@
+import argparse
+import os
+import shutil
+
+import numpy as np
+
+from intelligence import DATA_PATH, main_category
+from profiling import timed
+from review_store import slim_products
+
+# Scored products partitioned by main_category / segment_name.
+#
+# The pipeline writes the slim product frame (see review_store.py) as a
+# hive-partitioned Parquet dataset under PARTITIONED_DIR:
+#
+#   main_category=Electronics/segment_name=Best%20Deals/part-0.parquet
+#
+# Rows are sorted by discounted_price inside each file, so the row-group
+# min/max statistics let price filters skip row groups, and _metadata holds
+# every file's footer (schema + column statistics) so a query is planned
+# from one small file. product_row is the row's position in PRODUCTS_PATH;
+# read_products() returns frames indexed by it, in that order.
+#
+# PARTITIONED_DIR is only where pipeline.py stages the store: it publishes
+# it with each snapshot (snapshots.py), and the dashboard reads the current
+# snapshot's copy (live_data.py), which never changes under a reader and is
+# always the same version as the product frame the other pages show.
+#
+# read_products(columns, **filters) takes the Explorer filter arguments:
+# category / segment select partitions, the price / discount / rating ranges
+# and the risk / MRP flags are checked against row-group statistics, and only
+# the requested columns are decoded. The per-segment CSV extracts the
+# notebook used to write are VIEWS over one segment's partitions:
+#
+#   python partitioned_store.py --export top_best_deals   # or --export all
+
+PARTITIONED_DIR = "outputs/products_by_segment"
+METADATA_PATH = os.path.join(PARTITIONED_DIR, "_metadata")
+PARTITION_KEYS = ["main_category", "segment_name"]
+ROW_GROUP_SIZE = 16_384
+
+# extract name -> segment, sort order; VIEW_ROWS rows each
+VIEWS = {
+    "top_best_deals": {"segment": "Best Deals", "by": ["trust_score", "value_score"], "ascending": False},
+    "hidden_gems": {"segment": "Hidden Gems", "by": ["trust_score", "popularity_score"], "ascending": [False, True]},
+    "discount_traps": {"segment": "Discount Trap", "by": ["discount_percentage"], "ascending": False},
+}
+VIEW_ROWS = 20
+
+
+def _partitioning():
+    # pyarrow.dataset is only imported by the code paths that use the store
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([(k, pa.string()) for k in PARTITION_KEYS]), flavor="hive")
+
+
+def available(root=PARTITIONED_DIR):
+    # written by pipeline.py, and not older than a CSV from a standalone generate_data.py run
+    meta = os.path.join(root, "_metadata")
+    return os.path.exists(meta) and (
+        not os.path.exists(DATA_PATH) or os.path.getmtime(meta) >= os.path.getmtime(DATA_PATH)
+    )
+
+
+# ---------- Build (pipeline) ----------
+@timed()
+def write_partitioned(products, root=PARTITIONED_DIR):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    df = slim_products(products)
+    if "main_category" not in df.columns:
+        df["main_category"] = main_category(df["category"])
+    df = df.assign(product_row=np.arange(len(df))).sort_values("discounted_price", kind="stable")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    tmp = root + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    footers = []
+
+    def collect(written):
+        meta = written.metadata
+        meta.set_file_path(os.path.relpath(written.path, tmp))
+        footers.append(meta)
+
+    ds.write_dataset(
+        table, tmp, format="parquet", partitioning=_partitioning(),
+        basename_template="part-{i}.parquet", max_rows_per_group=ROW_GROUP_SIZE,
+        min_rows_per_group=ROW_GROUP_SIZE // 4, file_visitor=collect,
+    )
+    # the files themselves do not store the partition columns
+    file_schema = pa.schema([f for f in table.schema if f.name not in PARTITION_KEYS], metadata=table.schema.metadata)
+    pq.write_metadata(file_schema, os.path.join(tmp, "_metadata"), metadata_collector=footers)
+
+    # a directory cannot be os.replace()d over a non-empty one; move the old copy aside first
+    # (readers of the staged copy can miss it for a moment; the dashboard reads the snapshot's)
+    old = root + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(root):
+        os.rename(root, old)
+    os.rename(tmp, root)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+# ---------- Reads (dashboard / exports) ----------
+def _dataset(root=PARTITIONED_DIR):
+    import pyarrow.dataset as ds
+
+    return ds.parquet_dataset(os.path.join(root, "_metadata"), partitioning=_partitioning())
+
+
+def filter_expression(
+    category="All",
+    segment="All",
+    price_range=None,
+    discount_range=None,
+    rating_range=None,
+    only_risky=False,
+    only_mrp_outliers=False,
+):
+    # the intelligence.filter_products conditions that statistics can prune on
+    # (the name search is left to filter_products)
+    import pyarrow.dataset as ds
+
+    conditions = []
+    if category != "All":
+        conditions.append(ds.field("main_category") == category)
+    if segment != "All":
+        conditions.append(ds.field("segment_name") == segment)
+    for col, bounds in (
+        ("discounted_price", price_range),
+        ("discount_percentage", discount_range),
+        ("rating", rating_range),
+    ):
+        if bounds is not None:
+            conditions.append((ds.field(col) >= float(bounds[0])) & (ds.field(col) <= float(bounds[1])))
+    if only_risky:
+        conditions.append(ds.field("risk_flag") == 1)
+    if only_mrp_outliers:
+        conditions.append(ds.field("mrp_outlier") == 1)
+
+    expr = None
+    for c in conditions:
+        expr = c if expr is None else expr & c
+    return expr
+
+
+@timed()
+def read_products(columns=None, root=PARTITIONED_DIR, **filters):
+    dataset = _dataset(root)
+    if columns is not None:
+        columns = [c for c in dict.fromkeys([*columns, "product_row"]) if c in dataset.schema.names]
+    table = dataset.to_table(columns=columns, filter=filter_expression(**filters))
+    df = table.to_pandas().sort_values("product_row")
+    return df.set_index("product_row").rename_axis(None)
+
+
+def columns(root=PARTITIONED_DIR):
+    return _dataset(root).schema.names
+
+
+def partition_values(key, root=PARTITIONED_DIR):
+    # distinct values of a partition column, from the file paths alone
+    import pyarrow.dataset as ds
+
+    values = set()
+    for fragment in _dataset(root).get_fragments():
+        value = ds.get_partition_keys(fragment.partition_expression).get(key)
+        if value is not None:
+            values.add(value)
+    return sorted(values)
+
+
+def value_range(column, root=PARTITIONED_DIR):
+    # (min, max) of a column from the row-group statistics in _metadata
+    import pyarrow.parquet as pq
+
+    meta = pq.read_metadata(os.path.join(root, "_metadata"))
+    idx = meta.schema.to_arrow_schema().get_field_index(column)
+    lo, hi = [], []
+    for i in range(meta.num_row_groups):
+        stats = meta.row_group(i).column(idx).statistics
+        if stats is not None and stats.has_min_max:
+            lo.append(stats.min)
+            hi.append(stats.max)
+    return float(min(lo)), float(max(hi))
+
+
+def segment_view(name, root=PARTITIONED_DIR):
+    view = VIEWS[name]
+    df = read_products(segment=view["segment"], root=root)
+    return df.sort_values(view["by"], ascending=view["ascending"]).head(VIEW_ROWS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the per-segment extracts from the partitioned store")
+    parser.add_argument("--export", required=True, choices=[*VIEWS, "all"])
+    parser.add_argument("--out-dir", default="outputs")
+    args = parser.parse_args()
+
+    import snapshots
+
+    # the current snapshot's copy, as the dashboard sees it
+    manifest = snapshots.read_manifest()
+    root = (manifest and snapshots.snapshot_path(manifest, "partitions")) or PARTITIONED_DIR
+    if not os.path.exists(os.path.join(root, "_metadata")):
+        raise SystemExit("No partitioned store found; run pipeline.py first.")
+    for name in VIEWS if args.export == "all" else [args.export]:
+        path = os.path.join(args.out_dir, f"{name}.csv")
+        df = segment_view(name, root=root)
+        df.to_csv(path, index=False)
+        print(f"Wrote {len(df):,} rows to {path}")
+
+
+if __name__ == "__main__":
+    main()
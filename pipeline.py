@@ -0,0 +1,305 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+import add_nlp
+import dedup
+import nlp_resources
+import generate_data
+import ingest
+import intelligence
+import partitioned_store
+import price_history
+import price_outliers
+import review_store
+import risk_analytics
+import snapshots
+import sql_backend
+from profiling import span, print_report
+
+# Offline pipeline as a small DAG (replaces running generate_data.py and then
+# add_nlp.py, which re-read and re-wrote the output CSV):
+#
+#   raw -> clean -> features -> mrp_outliers -> score -> segment \
+#            |-> reviews -> text_features   (TextBlob, keywords) -> assemble -> with_offsets -> products -> risk_rollup
+#            |          \-> vader_sentiment                      /              /              /
+#            |          \-> risk_flags --------------------------/              /              /
+#            |-> names -> listing_groups (MinHash / LSH) --------/              /              /
+#            \-> review_table -> review_texts -> review_sentiment -> review_store               /
+#                                            \-> review_keywords -> review_risk -/              /
+#                                                               \-------------------------------/
+#
+# products / review_store are the normalized outputs described in
+# review_store.py, also written partitioned by category / segment
+# (partitioned_store.py); the full-width CSV is still written for older readers.
+# risk_rollup is the per category x segment table in risk_analytics.py.
+#
+# The NLP and dedup stages only need the review text or the product names,
+# so they run in a process pool while the scoring / clustering chain runs in
+# the main process. Results are
+# passed in memory; cacheable stages are also pickled to CACHE_DIR keyed by
+# their code and inputs, and skipped on the next run if nothing changed. A
+# stage's code is the module defining its function plus the modules it
+# declares in deps: the ones that function calls into or takes constants
+# from (e.g. score uses intelligence.VALUE_WEIGHTS, mrp_outliers uses
+# price_outliers.Z_MAX). Keep deps in step when a stage starts using another
+# module, or its cached result will outlive an edit there.
+#
+#   python pipeline.py [--raw data/amazon.csv] [--workers 3] [--force] [--db]
+
+CACHE_DIR = "outputs/.pipeline_cache"
+STATE_FILE = os.path.join(CACHE_DIR, "state.json")
+
+# parallel: run in the process pool; cache: pickle the result to CACHE_DIR;
+# deps: other modules whose code the stage's result depends on
+Stage = namedtuple("Stage", ["name", "fn", "inputs", "parallel", "cache", "deps"], defaults=(False, True, ()))
+
+
+def review_text(df):
+    return df["review_content"]
+
+
+def product_names(df):
+    return df["product_name"]
+
+
+def assemble(segmented, text, vader, risk, groups):
+    df = segmented.copy()
+    for col in text.columns:
+        df[col] = text[col]
+    df["sentiment_score"] = vader
+    df["risk_flag"] = risk
+    df["listing_group_id"] = groups
+    return df
+
+
+STAGES = [
+    Stage("raw", generate_data.load_raw, ["raw_path"], cache=False, deps=[ingest]),
+    Stage("clean", generate_data.clean, ["raw"], deps=[ingest]),
+    Stage("reviews", review_text, ["clean"], cache=False),
+    Stage("text_features", generate_data.text_features, ["reviews"], parallel=True),
+    Stage("vader_sentiment", add_nlp.sentiment_scores, ["reviews"], parallel=True),
+    Stage("risk_flags", add_nlp.risk_flags, ["reviews"], parallel=True),
+    Stage("names", product_names, ["clean"], cache=False),
+    Stage("listing_groups", dedup.listing_groups, ["names"], parallel=True),
+    Stage("review_table", review_store.explode_reviews, ["clean"]),
+    Stage("review_texts", review_store.review_content, ["review_table"], cache=False),
+    Stage("review_sentiment", add_nlp.sentiment_scores, ["review_texts"], parallel=True),
+    Stage("review_keywords", add_nlp.keyword_hits, ["review_texts"], parallel=True),
+    Stage("review_risk", add_nlp.flags_from_hits, ["review_keywords"], cache=False),
+    Stage("features", generate_data.add_features, ["clean"]),
+    Stage("mrp_outliers", generate_data.add_mrp_outliers, ["features"], deps=[price_outliers]),
+    Stage("score", generate_data.score, ["mrp_outliers"], deps=[intelligence]),
+    Stage("segment", generate_data.segment, ["score"]),
+    Stage("assemble", assemble, ["segment", "text_features", "vader_sentiment", "risk_flags", "listing_groups"]),
+    Stage("review_store", review_store.build_review_store, ["review_table", "review_sentiment", "review_risk"]),
+    Stage("with_offsets", review_store.add_review_offsets, ["assemble", "review_store"]),
+    Stage("products", risk_analytics.add_keyword_counts, ["with_offsets", "review_table", "review_keywords"], deps=[add_nlp]),
+    Stage("risk_rollup", risk_analytics.risk_rollup, ["products"], deps=[add_nlp]),
+]
+
+TARGETS = ["products", "review_store", "risk_rollup"]
+
+
+# ---------- Cache keys ----------
+def _sha(*parts):
+    h = hashlib.sha1()
+    for p in parts:
+        h.update(str(p).encode())
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def _code_version(fn, deps=()):
+    # any edit to the module that defines the stage, or to a module it declares in deps, invalidates it
+    # (unwrapped: @timed() stages would otherwise resolve to profiling.py)
+    files = [inspect.getfile(inspect.unwrap(fn))] + [inspect.getfile(m) for m in deps]
+    h = hashlib.sha1()
+    for path in files:
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _file_fingerprint(path):
+    st = os.stat(path)
+    return _sha(os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+
+def _output_fingerprints(paths):
+    # {path: fingerprint}, None for a missing output
+    return {p: _file_fingerprint(p) if os.path.exists(p) else None for p in paths}
+
+
+def stage_keys(stages, raw_path):
+    keys = {"raw_path": _file_fingerprint(raw_path)}
+    for stage in stages:
+        keys[stage.name] = _sha(stage.name, _code_version(stage.fn, stage.deps), *(keys[i] for i in stage.inputs))
+    return keys
+
+
+def _artifact_path(stage, key):
+    return os.path.join(CACHE_DIR, f"{stage.name}-{key}.pkl")
+
+
+def _store(stage, key, value):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for old in os.listdir(CACHE_DIR):
+        if old.startswith(stage.name + "-") and old.endswith(".pkl"):
+            os.remove(os.path.join(CACHE_DIR, old))
+    tmp = _artifact_path(stage, key) + ".tmp"
+    pd.to_pickle(value, tmp)
+    os.replace(tmp, _artifact_path(stage, key))
+
+
+# ---------- Runner ----------
+def plan(stages, keys, targets, use_cache=True):
+    # Walk back from the targets; a cached stage cuts off everything upstream of it.
+    by_name = {s.name: s for s in stages}
+    run, load = set(), set()
+    todo = list(targets)
+    while todo:
+        name = todo.pop()
+        if name in run or name in load or name not in by_name:
+            continue
+        stage = by_name[name]
+        if use_cache and stage.cache and os.path.exists(_artifact_path(stage, keys[name])):
+            load.add(name)
+        else:
+            run.add(name)
+            todo.extend(stage.inputs)
+    return run, load
+
+
+def run_pipeline(raw_path, targets=TARGETS, workers=None, use_cache=True, stages=STAGES):
+    keys = stage_keys(stages, raw_path)
+    run, load = plan(stages, keys, targets, use_cache)
+    by_name = {s.name: s for s in stages}
+    values = {"raw_path": raw_path}
+    report = {}
+
+    for name in load:
+        with span(f"load:{name}"):
+            values[name] = pd.read_pickle(_artifact_path(by_name[name], keys[name]))
+        report[name] = "cached"
+
+    def finished(stage, value, seconds):
+        values[stage.name] = value
+        report[stage.name] = f"{seconds:.2f}s"
+        if stage.cache and use_cache:
+            _store(stage, keys[stage.name], value)
+
+    pending = [s for s in stages if s.name in run]
+    running = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            ready = [s for s in pending if all(i in values for i in s.inputs)]
+
+            # hand every ready parallel stage to the pool first ...
+            for stage in [s for s in ready if s.parallel]:
+                pending.remove(stage)
+                args = [values[i] for i in stage.inputs]
+                running[pool.submit(stage.fn, *args)] = (stage, time.perf_counter())
+
+            # ... then do one in-process stage while they run
+            inline = [s for s in ready if not s.parallel]
+            if inline:
+                stage = inline[0]
+                pending.remove(stage)
+                t0 = time.perf_counter()
+                with span(stage.name):
+                    value = stage.fn(*[values[i] for i in stage.inputs])
+                finished(stage, value, time.perf_counter() - t0)
+                continue
+
+            if not running:
+                raise RuntimeError(f"Pipeline stuck; unresolved stages: {[s.name for s in pending]}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, t0 = running.pop(future)
+                finished(stage, future.result(), time.perf_counter() - t0)
+
+    return {t: values[t] for t in targets}, keys, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline pipeline as a parallel DAG")
+    parser.add_argument("--raw", default=generate_data.RAW_PATH)
+    parser.add_argument("--output", default=generate_data.OUTPUT_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="ignore cached stage results")
+    parser.add_argument("--db", action="store_true", help=f"also write the SQLite backend ({sql_backend.DB_PATH})")
+    args = parser.parse_args()
+
+    state = {}
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+
+    outputs = [
+        args.output, review_store.PRODUCTS_PATH, review_store.REVIEWS_PATH,
+        partitioned_store.METADATA_PATH, risk_analytics.RISK_ROLLUP_PATH, snapshots.MANIFEST_PATH,
+    ]
+    if args.db:
+        outputs.append(sql_backend.DB_PATH)
+    keys = stage_keys(STAGES, args.raw)
+    target_key = _sha(*(keys[t] for t in TARGETS))
+    # up to date only if the outputs (CURRENT.json included) are still the ones this
+    # run wrote: generate_data.py / add_nlp.py rewrite the CSV and publish over them
+    last = state.get(args.output)
+    if (
+        not args.force
+        and isinstance(last, dict)
+        and last.get("key") == target_key
+        and last.get("outputs") == _output_fingerprints(outputs)
+    ):
+        print(f"{args.output} is already up to date (snapshot {last.get('snapshot')})")
+        return
+
+    nlp_resources.ensure(["vader_lexicon"])
+
+    results, keys, report = run_pipeline(args.raw, workers=args.workers, use_cache=not args.force)
+    df, reviews = results["products"], results["review_store"]
+
+    for stage in STAGES:
+        print(f"{stage.name:<18} {report.get(stage.name, 'skipped')}")
+
+    with span("save"):
+        snapshots.replace_csv(df, args.output)
+        review_store.write_store(df, reviews)
+        partitioned_store.write_partitioned(df)
+        risk_analytics.write_rollup(results["risk_rollup"])
+        if args.db:
+            sql_backend.write_db(df)
+        changed = price_history.append_snapshot(df)
+        # last, once every output is in place: the running dashboard switches over on this
+        version = snapshots.publish({
+            "products": review_store.PRODUCTS_PATH,
+            "reviews": review_store.REVIEWS_PATH,
+            "partitions": partitioned_store.PARTITIONED_DIR,
+            "risk_rollup": risk_analytics.RISK_ROLLUP_PATH,
+        })
+    state[args.output] = {"key": target_key, "snapshot": version, "outputs": _output_fingerprints(outputs)}
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(STATE_FILE, "w") as f:
+        json.dump(state, f, indent=2)
+
+    print(f"Data generated and saved to {args.output} ({len(df):,} products)")
+    print(f"Review store: {review_store.PRODUCTS_PATH}, {review_store.REVIEWS_PATH} ({len(reviews):,} reviews)")
+    print(f"Partitioned by category / segment: {partitioned_store.PARTITIONED_DIR}")
+    print(f"Published snapshot {version} ({snapshots.MANIFEST_PATH})")
+    if args.db:
+        print(f"SQLite backend: {sql_backend.DB_PATH}")
+    print(f"Price history: {changed:,} changed product(s) appended to {price_history.HISTORY_DIR}")
+    print_report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import argparse
+import glob
+import os
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from profiling import timed
+
+# Append-only price / rating history.
+#
+# Every pipeline run appends one snapshot to HISTORY_DIR, partitioned by
+# date (date=YYYY-MM-DD/part-<time>-<id>.parquet). A snapshot only holds the
+# products whose tracked values changed since the previous one, so a
+# product's history is the sequence of its change rows. Values are stored as
+# scaled integers (paise, hundredths) with DELTA_BINARY_PACKED encoding and
+# rows are sorted by product_id, so a per-product read only touches the row
+# groups whose product_id range contains it.
+#
+#   python price_history.py --inflated        # products with an inflated MRP before a discount
+
+HISTORY_DIR = "outputs/history"
+LATEST_PATH = os.path.join(HISTORY_DIR, "_latest.parquet")  # last known state, used to compute deltas
+
+# tracked column -> integer scale
+TRACKED = {
+    "actual_price": 100,
+    "discounted_price": 100,
+    "discount_percentage": 100,
+    "rating": 100,
+    "rating_count": 1,
+}
+
+ROW_GROUP_SIZE = 8192
+
+
+# ---------- Write (pipeline) ----------
+def encode(df):
+    # product frame -> product_id + scaled nullable ints, one row per product_id
+    out = pd.DataFrame({"product_id": df["product_id"].astype(str).to_numpy()})
+    for col, scale in TRACKED.items():
+        out[col] = pd.array(np.round(df[col].to_numpy(dtype=float) * scale), dtype="Int64")
+    return out.drop_duplicates("product_id").sort_values("product_id", ignore_index=True)
+
+
+def decode(table):
+    df = table.to_pandas()
+    for col, scale in TRACKED.items():
+        if col in df.columns:
+            df[col] = df[col].astype(float) / scale
+    return df
+
+
+def changed_rows(current, latest):
+    # rows of `current` that are new or differ from `latest` in any tracked column
+    if latest is None or len(latest) == 0:
+        return current
+    merged = current.merge(latest, on="product_id", how="left", suffixes=("", "_prev"), indicator=True)
+    changed = merged["_merge"] == "left_only"
+    for col in TRACKED:
+        a, b = merged[col], merged[f"{col}_prev"]
+        changed |= (a != b).fillna(a.isna() != b.isna())
+    return current[changed.to_numpy()]
+
+
+def _write_parquet(table, path):
+    # dot-prefixed while being written, so dataset scans never pick it up
+    tmp = os.path.join(os.path.dirname(path), "." + os.path.basename(path) + ".tmp")
+    pq.write_table(
+        table,
+        tmp,
+        row_group_size=ROW_GROUP_SIZE,
+        use_dictionary=["product_id"],
+        column_encoding={col: "DELTA_BINARY_PACKED" for col in TRACKED},
+        compression="zstd",
+    )
+    os.replace(tmp, path)
+
+
+@timed()
+def append_snapshot(products, when=None, history_dir=HISTORY_DIR):
+    # returns the number of product rows written (0 when nothing changed)
+    when = (when or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(microsecond=0)
+    latest_path = os.path.join(history_dir, os.path.basename(LATEST_PATH))
+
+    current = encode(products)
+    latest = pd.read_parquet(latest_path) if os.path.exists(latest_path) else None
+    delta = changed_rows(current, latest)
+    if len(delta) == 0:
+        return 0
+
+    delta = delta.assign(snapshot_at=pd.Timestamp(when.replace(tzinfo=None)))
+    partition = os.path.join(history_dir, f"date={when:%Y-%m-%d}")
+    os.makedirs(partition, exist_ok=True)
+    schema = pa.schema(
+        [("product_id", pa.string())]
+        + [(col, pa.int64()) for col in TRACKED]
+        + [("snapshot_at", pa.timestamp("s"))]
+    )
+    table = pa.Table.from_pandas(delta, schema=schema, preserve_index=False)
+    _write_parquet(table, os.path.join(partition, f"part-{when:%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"))
+
+    # the latest state is the only file that is rewritten
+    state = current if latest is None else pd.concat(
+        [latest[~latest["product_id"].isin(delta["product_id"])], delta[latest.columns]], ignore_index=True
+    )
+    _write_parquet(pa.Table.from_pandas(state, schema=schema.remove(len(schema) - 1), preserve_index=False), latest_path)
+    return len(delta)
+
+
+# ---------- Read (dashboard) ----------
+def history_version(history_dir=HISTORY_DIR):
+    # changes whenever a snapshot is appended; use it as a cache key
+    latest_path = os.path.join(history_dir, os.path.basename(LATEST_PATH))
+    return os.path.getmtime(latest_path) if os.path.exists(latest_path) else None
+
+
+def _dataset(history_dir):
+    partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+    return ds.dataset(history_dir, format="parquet", partitioning=partitioning)
+
+
+def _date_filter(start, end):
+    # ISO dates compare correctly as strings
+    expr = None
+    if start is not None:
+        expr = ds.field("date") >= str(pd.Timestamp(start).date())
+    if end is not None:
+        upper = ds.field("date") <= str(pd.Timestamp(end).date())
+        expr = upper if expr is None else expr & upper
+    return expr
+
+
+@timed()
+def product_history(product_id, start=None, end=None, history_dir=HISTORY_DIR):
+    # one product's change rows, oldest first; date partitions outside
+    # [start, end] and row groups without the product are skipped
+    if not glob.glob(os.path.join(history_dir, "date=*")):
+        return pd.DataFrame(columns=["product_id", "snapshot_at", *TRACKED])
+    expr = ds.field("product_id") == str(product_id)
+    dates = _date_filter(start, end)
+    if dates is not None:
+        expr = expr & dates
+    table = _dataset(history_dir).to_table(filter=expr, columns=["product_id", "snapshot_at", *TRACKED])
+    return decode(table).sort_values("snapshot_at", ignore_index=True)
+
+
+def load_history(start=None, end=None, history_dir=HISTORY_DIR):
+    if not glob.glob(os.path.join(history_dir, "date=*")):
+        return pd.DataFrame(columns=["product_id", "snapshot_at", *TRACKED])
+    table = _dataset(history_dir).to_table(filter=_date_filter(start, end), columns=["product_id", "snapshot_at", *TRACKED])
+    return decode(table)
+
+
+# ---------- Inflated MRP before a discount ----------
+@timed()
+def inflated_before_discount(history, window_days=30, min_increase=0.10, tolerance=0.02):
+    # A discount event is a change row whose discount % went up. It is
+    # flagged when, compared with the product's state window_days earlier
+    # (or its first observation, if that is more recent), the actual price
+    # rose by at least min_increase while the discounted price did not fall
+    # by more than tolerance: the "discount" came from raising the MRP.
+    cols = ["product_id", "snapshot_at", "actual_price", "discounted_price", "discount_percentage"]
+    h = history[cols].sort_values(["product_id", "snapshot_at"], ignore_index=True)
+    h["snapshot_at"] = h["snapshot_at"].astype("datetime64[ns]")
+    if len(h) == 0:
+        return h.assign(baseline_actual=[], baseline_discounted=[], baseline_at=[])
+
+    prev_discount = h.groupby("product_id")["discount_percentage"].shift()
+    events = h[h["discount_percentage"] > prev_discount].copy()
+    events["lookup_at"] = events["snapshot_at"] - pd.Timedelta(days=window_days)
+
+    baseline = h.rename(columns={
+        "snapshot_at": "baseline_at", "actual_price": "baseline_actual", "discounted_price": "baseline_discounted",
+    })[["product_id", "baseline_at", "baseline_actual", "baseline_discounted"]]
+    first = baseline.groupby("product_id", sort=False).head(1).set_index("product_id")
+
+    events = pd.merge_asof(
+        events.sort_values("lookup_at"), baseline.sort_values("baseline_at"),
+        left_on="lookup_at", right_on="baseline_at", by="product_id", direction="backward",
+    )
+    missing = events["baseline_at"].isna()
+    for col in ("baseline_at", "baseline_actual", "baseline_discounted"):
+        events.loc[missing, col] = events.loc[missing, "product_id"].map(first[col]).to_numpy()
+
+    flagged = (
+        (events["baseline_at"] < events["snapshot_at"])
+        & (events["actual_price"] >= events["baseline_actual"] * (1 + min_increase))
+        & (events["discounted_price"] >= events["baseline_discounted"] * (1 - tolerance))
+    )
+    out = events[flagged].drop(columns="lookup_at")
+    return out.sort_values(["product_id", "snapshot_at"], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the price / rating history store")
+    parser.add_argument("--product", help="print one product's history")
+    parser.add_argument("--inflated", action="store_true", help="list inflated-MRP-before-discount events")
+    parser.add_argument("--window-days", type=int, default=30)
+    args = parser.parse_args()
+
+    if args.product:
+        print(product_history(args.product).to_string(index=False))
+    if args.inflated:
+        flagged = inflated_before_discount(load_history(), window_days=args.window_days)
+        print(flagged.to_string(index=False) if len(flagged) else "No inflated-MRP discounts found.")
+    if not args.product and not args.inflated:
+        files = glob.glob(os.path.join(HISTORY_DIR, "date=*", "*.parquet"))
+        print(f"{len(files)} snapshot file(s) in {HISTORY_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from profiling import timed
+
+# Inflated-MRP detector.
+#
+# A product's actual price (MRP) is compared with similar products: the
+# median and MAD (median absolute deviation) of log prices in its
+# subcategory (the full category path), or in its main_category when the
+# subcategory has fewer than MIN_GROUP products. The robust z-score
+# 0.6745 * (x - median) / MAD marks an outlier above Z_MAX. A product is
+# flagged when its MRP is an outlier but its selling price is not, i.e. the
+# "discount" comes from an implausibly high MRP rather than from a premium
+# product. Medians are taken per group by sorting once on (group, value), so
+# millions of rows take seconds and no Python loop runs over groups.
+
+MIN_GROUP = 20
+Z_MAX = 3.5
+MAD_FLOOR = 0.05  # in log price, ~5%: groups of identical prices do not flag every other price
+PRICE_COLUMNS = {"actual_price": "mrp_z", "discounted_price": "price_z"}
+
+
+def group_median(values, codes, n_groups):
+    # (median per group, non-NaN count per group) for integer group codes 0..n_groups-1
+    ok = ~np.isnan(values)
+    v, c = values[ok], codes[ok]
+    if len(v):
+        # one argsort on group * span + value orders by group, then value
+        lo, span = v.min(), v.max() - v.min() + 1
+        v = v[np.argsort(c * span + (v - lo))]
+    counts = np.bincount(c, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    has = counts > 0
+    med = np.full(n_groups, np.nan)
+    med[has] = (v[(starts + (counts - 1) // 2)[has]] + v[(starts + counts // 2)[has]]) / 2
+    return med, counts
+
+
+def robust_z(values, codes, n_groups):
+    # per-row robust z-score against the row's group, plus the group sizes
+    med, counts = group_median(values, codes, n_groups)
+    mad, _ = group_median(np.abs(values - med[codes]), codes, n_groups)
+    return 0.6745 * (values - med[codes]) / np.maximum(mad[codes], MAD_FLOOR), counts[codes]
+
+
+@timed()
+def mrp_outliers(df):
+    # mrp_z / price_z (robust z of log actual / discounted price) and mrp_outlier (0/1)
+    # main_category of each distinct path only, not of every row
+    sub_codes, subs = pd.factorize(df["category"].astype(str))
+    sub_main, mains = pd.factorize(pd.Series(subs).str.split("|", n=1).str[0])
+    main_codes = sub_main[sub_codes]
+
+    out = pd.DataFrame(index=df.index)
+    for col, name in PRICE_COLUMNS.items():
+        logp = np.log(df[col].to_numpy(dtype=float).clip(min=1))
+        z_sub, n_sub = robust_z(logp, sub_codes, len(subs))
+        z_main, n_main = robust_z(logp, main_codes, len(mains))
+        z = np.where(n_sub >= MIN_GROUP, z_sub, np.where(n_main >= MIN_GROUP, z_main, np.nan))
+        out[name] = z.astype(np.float32)
+
+    out["mrp_outlier"] = ((out["mrp_z"] > Z_MAX) & ~(out["price_z"] > Z_MAX)).astype(np.int8)
+    return out
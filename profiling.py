@@ -0,0 +1,172 @@
+import collections
+import contextlib
+import cProfile
+import functools
+import os
+import re
+import sys
+import threading
+import time
+
+# Lightweight timing spans for the pipeline scripts and dashboard pages.
+#
+#   APP_TIMINGS=1              record spans (shown in the page sidebar / printed by scripts)
+#   APP_PROFILE=cprofile       also dump a cProfile .prof file per top-level span
+#   APP_PROFILE=stacks         also dump sampled call stacks (collapsed / flamegraph format)
+#   APP_PROFILE_DIR=<dir>      where dumps go (default outputs/profiles)
+#   APP_PROFILE_INTERVAL=<ms>  stack sampling interval (default 5)
+#
+# With nothing set, span() hands back a shared no-op context manager and
+# @timed functions call straight through, so the instrumentation can stay
+# in the code permanently.
+
+PROFILE_MODE = os.environ.get("APP_PROFILE", "").strip().lower()
+PROFILE_DIR = os.environ.get("APP_PROFILE_DIR", "outputs/profiles")
+SAMPLE_INTERVAL = float(os.environ.get("APP_PROFILE_INTERVAL", "5")) / 1000
+
+_enabled = os.environ.get("APP_TIMINGS", "") not in ("", "0") or bool(PROFILE_MODE)
+_NULL = contextlib.nullcontext()
+_local = threading.local()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def records():
+    # spans recorded on this thread since the last reset(), in start order
+    return list(getattr(_local, "records", []))
+
+
+def reset():
+    _local.records = []
+    _local.depth = 0
+
+
+class _Span:
+    __slots__ = ("name", "start", "index", "dump")
+
+    def __init__(self, name):
+        self.name = name
+        self.dump = None
+
+    def __enter__(self):
+        if not hasattr(_local, "records"):
+            reset()
+        depth = _local.depth
+        _local.depth += 1
+        self.index = len(_local.records)
+        _local.records.append({"span": self.name, "depth": depth, "seconds": None})
+        if depth == 0 and PROFILE_MODE == "cprofile":
+            self.dump = _CProfileDump(self.name)
+        elif depth == 0 and PROFILE_MODE == "stacks":
+            self.dump = _StackSampler(self.name)
+        if self.dump is not None:
+            self.dump.start()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if self.dump is not None:
+            self.dump.stop()
+        _local.depth -= 1
+        _local.records[self.index]["seconds"] = elapsed
+        return False
+
+
+def span(name):
+    if not _enabled:
+        return _NULL
+    return _Span(name)
+
+
+def timed(name=None):
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(label):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def format_records(recs=None):
+    recs = records() if recs is None else recs
+    lines = []
+    for r in recs:
+        label = "  " * r["depth"] + r["span"]
+        secs = "running" if r["seconds"] is None else f"{r['seconds'] * 1000:10.1f} ms"
+        lines.append(f"{label:<40} {secs}")
+    return "\n".join(lines)
+
+
+def print_report():
+    if _enabled and records():
+        print("\n--- timings ---")
+        print(format_records())
+
+
+# ---------- Profile dumps ----------
+def _dump_path(name, suffix):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(PROFILE_DIR, f"{safe}-{stamp}-{os.getpid()}{suffix}")
+
+
+class _CProfileDump:
+    def __init__(self, name):
+        self.name = name
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.profiler.dump_stats(_dump_path(self.name, ".prof"))
+
+
+class _StackSampler:
+    # Samples the calling thread's stack from a background thread and writes
+    # "frame;frame;frame count" lines (flamegraph.pl / speedscope compatible).
+
+    def __init__(self, name):
+        self.name = name
+        self.thread_id = threading.get_ident()
+        self.counts = collections.Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stopped.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        with open(_dump_path(self.name, ".stacks.txt"), "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
@@ -0,0 +1,147 @@
+import collections
+import inspect
+import json
+import os
+import threading
+
+import numpy as np
+
+from profiling import timed
+
+# Process-wide LRU cache of dashboard query results.
+#
+# Streamlit serves every session from one process, so a module-level cache
+# lets a Recommendation Engine ranking or Explorer filter computed for one
+# analyst answer the same query from anyone else. A result is stored as the
+# row positions it selects from the frame it ran on (plus the few per-row
+# columns the query adds, e.g. final_score), not as a DataFrame copy, and is
+# rebuilt with df.take() on a hit.
+#
+# Keys are (query name, dataset version, normalized arguments): defaults are
+# filled in, floats rounded and tuples made lists, so equivalent calls share
+# an entry. A new dataset version drops that query's older entries. Least
+# recently used entries are evicted once the arrays exceed QUERY_CACHE_MB or
+# there are more than QUERY_CACHE_ENTRIES of them.
+#
+#   QUERY_CACHE_MB=64          byte budget of the stored arrays
+#   QUERY_CACHE_ENTRIES=4096   entry budget
+#   QUERY_CACHE_MB=0           disable
+
+MAX_BYTES = int(float(os.environ.get("QUERY_CACHE_MB", "64")) * 2**20)
+MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_ENTRIES", "4096"))
+KEY_OVERHEAD = 200  # rough bytes per entry for the key, dict slot and tuple
+
+
+def _plain(value):
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (tuple, list)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, str) and not value.strip():
+        return ""
+    return value
+
+
+def descriptor(fn, **params):
+    # canonical JSON of fn's keyword arguments, defaults filled in
+    bound = inspect.signature(fn).bind_partial(**params)
+    bound.apply_defaults()
+    args = dict(bound.arguments)
+    args.pop("df", None)
+    for p in inspect.signature(fn).parameters.values():
+        if p.kind is p.VAR_KEYWORD:
+            args.update(args.pop(p.name, {}))
+    args = {k: _plain(v) for k, v in args.items()}
+    return json.dumps(args, sort_keys=True, default=str)
+
+
+class QueryCache:
+    def __init__(self, max_bytes=MAX_BYTES, max_entries=MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()  # key -> (positions, extra columns, nbytes)
+        self._versions = {}  # query name -> newest dataset version seen
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def _drop(self, key):
+        self.bytes -= self._entries.pop(key)[2]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[:2]
+
+    def put(self, key, positions, extras):
+        # positions=None: the result covers every row of the frame, in order
+        nbytes = (0 if positions is None else positions.nbytes) + sum(a.nbytes for a in extras.values()) + KEY_OVERHEAD
+        if nbytes > self.max_bytes:
+            return
+        name, version = key[0], key[1]
+        with self._lock:
+            if self._versions.get(name) != version:
+                # the data was rewritten: this query's older results can never hit again
+                for stale in [k for k in self._entries if k[0] == name and k[1] != version]:
+                    self._drop(stale)
+                self._versions[name] = version
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (positions, extras, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "mb": round(self.bytes / 2**20, 3),
+                "max_mb": round(self.max_bytes / 2**20, 3),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+
+CACHE = QueryCache()
+
+
+@timed()
+def cached(fn, df, version, cache=CACHE, **params):
+    # fn(df, **params) for a query that returns rows of df (filtered and/or
+    # reordered, possibly with added columns), answered from `cache` when the
+    # same query already ran on this dataset version
+    if version is None or cache.max_bytes <= 0:
+        return fn(df, **params)
+    key = (fn.__name__, version, descriptor(fn, **params))
+    entry = cache.get(key)
+    if entry is not None:
+        positions, extras = entry
+        return df.take(positions).assign(**{c: a.copy() for c, a in extras.items()})
+
+    result = fn(df, **params)
+    # df's index is unique (a RangeIndex or product_row), so labels map to one position each
+    positions = df.index.get_indexer(result.index)
+    positions = positions.astype(np.int32 if len(df) < 2**31 else np.int64)
+    extras = {c: result[c].to_numpy() for c in result.columns if c not in df.columns}
+    cache.put(key, positions, extras)
+    return result
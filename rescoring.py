@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import query_cache
+from intelligence import BADGES, OVERALL_WEIGHTS, RATING_PRIOR_QUANTILE, VALUE_WEIGHTS, badge_conditions
+from profiling import timed
+
+# Whole-catalog re-scoring with user-chosen weights.
+#
+# generate_data.score fixes the value_score discount / price mix and the
+# rating-count quantile m of the weighted rating, and the Compare page fixes
+# the trust / value / popularity blend of the overall score. rescore() takes
+# any of them:
+#
+#   discount, price             value_score mix (scaled to sum to 1)
+#   m_quantile                  rating-count quantile used as the prior weight m
+#   trust, value, popularity    overall_score blend (scaled to sum to 1)
+#
+# plus category_weights, {main_category: weights} overriding them for single
+# categories, and recomputes value_score, trust_score, overall_score and the
+# deal badge of every product in one vectorized pass. With overrides each
+# weight becomes a per-row array, taken from a small per-category table by
+# the products' category codes; min-max normalization stays catalog-wide, so
+# scores remain comparable across categories.
+#
+# The parts that do not depend on the weights are computed once per dataset
+# version (Components): the min-max normalized price and discount, the
+# ratings, the mean rating, the sorted rating counts (so m is an
+# interpolation instead of a quantile over the catalog) and the category
+# codes. Results are memoized per (dataset version, weights, category
+# overrides) in a small query_cache.QueryCache: float32 scores and int8 badge
+# codes, ~13 bytes per product, evicted least-recently-used past
+# RESCORE_CACHE_MB.
+# With the default weights the stored scores and badges come back.
+
+DEFAULT_WEIGHTS = {**VALUE_WEIGHTS, "m_quantile": RATING_PRIOR_QUANTILE, **OVERALL_WEIGHTS}
+CACHE = query_cache.QueryCache(
+    max_bytes=int(float(os.environ.get("RESCORE_CACHE_MB", "128")) * 2**20), max_entries=32
+)
+
+
+def _minmax(values):
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    return (values - lo) / (hi - lo)
+
+
+class Components:
+    # the weight-independent inputs of scoring, for one product frame
+    def __init__(self, df):
+        self.discount_n = _minmax(df["discount_percentage"].to_numpy(dtype=float))
+        self.price_n = 1 - _minmax(df["discounted_price"].to_numpy(dtype=float))
+        self.rating = df["rating"].to_numpy(dtype=float)
+        self.count = df["rating_count"].to_numpy(dtype=float)
+        self.mean_rating = np.nanmean(self.rating)
+        self.sorted_count = np.sort(self.count[~np.isnan(self.count)])
+        self.discount = df["discount_percentage"].to_numpy(dtype=float)
+        self.popularity = df["popularity_score"].to_numpy(dtype=float)
+        codes, self.categories = pd.factorize(df["main_category"])
+        # products without a category get the last slot, which always holds the catalog-wide weights
+        self.category_codes = np.where(codes < 0, len(self.categories), codes)
+
+    def count_quantile(self, q):
+        # pandas' linear-interpolation quantile, from the sorted counts (q: scalar or array)
+        pos = np.asarray(q) * (len(self.sorted_count) - 1)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, len(self.sorted_count) - 1)
+        return self.sorted_count[lo] + (self.sorted_count[hi] - self.sorted_count[lo]) * (pos - lo)
+
+    def row_weights(self, weights, category_weights=None):
+        # weights as scalars, or per-row arrays when some categories override them
+        if not category_weights:
+            return {**weights, "m": self.count_quantile(weights["m_quantile"])}
+        slots = [category_weights.get(c, weights) for c in self.categories] + [weights]
+        rows = {k: np.array([w[k] for w in slots])[self.category_codes] for k in weights}
+        rows["m"] = self.count_quantile([w["m_quantile"] for w in slots])[self.category_codes]
+        return rows
+
+    def score(self, weights, category_weights=None):
+        # {column: array} for one normalized weight set and its per-category overrides
+        weights = self.row_weights(weights, category_weights)
+        m = weights["m"]
+        v = self.count
+        trust = _minmax((v / (v + m)) * self.rating + (m / (v + m)) * self.mean_rating) * 100
+        value = (weights["discount"] * self.discount_n + weights["price"] * self.price_n) * 100
+        overall = weights["trust"] * trust + weights["value"] * value + weights["popularity"] * self.popularity
+        conditions = badge_conditions(value, trust, self.discount, self.popularity)
+        badge = np.select(conditions, range(len(BADGES) - 1), default=len(BADGES) - 1).astype(np.int8)
+        return {
+            "value_score": value.astype(np.float32),
+            "trust_score": trust.astype(np.float32),
+            "overall_score": overall.astype(np.float32),
+            "badge_code": badge,
+        }
+
+
+def normalize_weights(**weights):
+    # defaults filled in; each blend scaled to sum to 1 (equal parts when it sums to 0)
+    w = {k: float(weights.get(k, d)) for k, d in DEFAULT_WEIGHTS.items()}
+    for group in (("discount", "price"), ("trust", "value", "popularity")):
+        total = sum(w[k] for k in group)
+        for k in group:
+            w[k] = round(w[k] / total if total > 0 else 1 / len(group), 6)
+    w["m_quantile"] = round(min(max(w["m_quantile"], 0.0), 1.0), 6)
+    return w
+
+
+_components = {}
+_components_lock = threading.Lock()
+
+
+def components(df, version):
+    # one Components per dataset version; a new version replaces the old one
+    with _components_lock:
+        if version not in _components:
+            _components.clear()
+            _components[version] = Components(df)
+        return _components[version]
+
+
+def normalize_category_weights(category_weights, **weights):
+    # {category: normalized weights}; unset weights fall back to the catalog-wide ones,
+    # and categories that end up with exactly those are dropped
+    base = normalize_weights(**weights)
+    out = {}
+    for category, w in (category_weights or {}).items():
+        w = normalize_weights(**{**base, **w})
+        if w != base:
+            out[str(category)] = w
+    return out
+
+
+@timed()
+def rescore(df, version, cache=CACHE, category_weights=None, **weights):
+    # value_score / trust_score / overall_score / deal_badge of every row of df under `weights`,
+    # with category_weights ({main_category: weights}) overriding them for those categories
+    overrides = normalize_category_weights(category_weights, **weights)
+    weights = normalize_weights(**weights)
+    key = ("rescore", version, json.dumps({"weights": weights, "categories": overrides}, sort_keys=True))
+    entry = cache.get(key)
+    if entry is None:
+        scores = components(df, version).score(weights, overrides)
+        cache.put(key, None, scores)
+    else:
+        scores = entry[1]
+    out = pd.DataFrame({c: scores[c] for c in ("value_score", "trust_score", "overall_score")}, index=df.index)
+    out["deal_badge"] = pd.Categorical.from_codes(scores["badge_code"], BADGES)
+    return out
@@ -0,0 +1,149 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+from profiling import timed
+
+# Normalized review store.
+#
+# The raw rows carry every review of a product comma-joined into user_id,
+# user_name, review_id, review_title and review_content. The pipeline
+# explodes them into REVIEWS_PATH (one row per review, with per-review
+# sentiment / risk), stored in product order, and gives each product a
+# review_offset / review_count into that table. PRODUCTS_PATH holds the
+# product frame without the bulky text columns, so pages load it eagerly
+# and read review rows only when they need them.
+
+PRODUCTS_PATH = "outputs/products.parquet"
+REVIEWS_PATH = "outputs/reviews.parquet"
+
+# heavy per-product text that stays out of the slim product frame
+TEXT_COLUMNS = [
+    "about_product", "user_id", "user_name", "review_id",
+    "review_title", "review_content", "img_link", "product_link",
+]
+
+# comma-joined per-review fields; review_id decides how many reviews a product has
+REVIEW_FIELDS = ["review_id", "user_id", "user_name", "review_title", "review_content"]
+
+ROW_GROUP_SIZE = 65_536
+
+
+# ---------- Build (pipeline) ----------
+# the join separator: a comma not followed by whitespace, so "Works well, fast
+# charging" stays one review
+JOIN_SEPARATOR = r",(?=\S)"
+
+
+def _split_field(values, counts):
+    # When a field still does not split into exactly `count` parts (a comma
+    # glued to the next word inside a review) the whole text goes on the first review.
+    parts = values.fillna("").astype(str).str.split(JOIN_SEPARATOR, regex=True)
+    out = []
+    for p, n, text in zip(parts, counts, values):
+        if n == 0:
+            continue
+        if len(p) == n:
+            out.append(p)
+        else:
+            out.append([None if pd.isna(text) else text] + [None] * (n - 1))
+    return list(itertools.chain.from_iterable(out))
+
+
+@timed()
+def explode_reviews(df):
+    ids = df["review_id"]
+    counts = np.where(ids.isna(), 0, ids.fillna("").astype(str).str.count(",") + 1).astype(np.int64)
+
+    reviews = pd.DataFrame({
+        "product_row": np.repeat(np.arange(len(df), dtype=np.int64), counts),
+        "product_id": np.repeat(df["product_id"].to_numpy(), counts),
+    })
+    for field in REVIEW_FIELDS:
+        if field in df.columns:
+            reviews[field] = _split_field(df[field], counts)
+    return reviews
+
+
+def review_content(reviews):
+    return reviews["review_content"]
+
+
+def build_review_store(reviews, sentiment, risk):
+    reviews = reviews.copy()
+    reviews["sentiment_score"] = sentiment.to_numpy()
+    reviews["risk_flag"] = risk.to_numpy().astype(np.int8)
+    return reviews
+
+
+def add_review_offsets(products, reviews):
+    products = products.copy()
+    counts = np.bincount(reviews["product_row"].to_numpy(), minlength=len(products))
+    products["review_count"] = counts
+    products["review_offset"] = np.cumsum(counts) - counts
+    return products
+
+
+def slim_products(products):
+    return products.drop(columns=[c for c in TEXT_COLUMNS if c in products.columns])
+
+
+@timed()
+def write_store(products, reviews, products_path=PRODUCTS_PATH, reviews_path=REVIEWS_PATH):
+    for frame, path in ((slim_products(products), products_path), (reviews, reviews_path)):
+        tmp = path + ".tmp"
+        frame.to_parquet(tmp, index=False, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp, path)
+
+
+# ---------- Lazy reads (dashboard) ----------
+def read_review_ranges(ranges, columns=None, path=REVIEWS_PATH):
+    # ranges: iterable of (offset, count), results come back in the same order;
+    # only the row groups they touch are read
+    ranges = [(int(o), int(c)) for o, c in ranges if c > 0]
+    if not ranges or path is None or not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+
+    # pyarrow is only needed once a page actually reads reviews
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path)
+    starts = np.cumsum([0] + [pf.metadata.row_group(i).num_rows for i in range(pf.num_row_groups)])
+
+    spans = []
+    for offset, count in ranges:
+        first = int(np.searchsorted(starts, offset, side="right")) - 1
+        last = int(np.searchsorted(starts, offset + count - 1, side="right")) - 1
+        spans.append((offset, count, first, last))
+
+    # each touched row group is read once, however many products fall in it
+    needed = sorted({g for _, _, first, last in spans for g in range(first, last + 1)})
+    groups = {g: pf.read_row_group(g, columns=columns) for g in needed}
+
+    frames = []
+    for offset, count, first, last in spans:
+        table = pa.concat_tables([groups[g] for g in range(first, last + 1)])
+        frames.append(table.slice(int(offset - starts[first]), count).to_pandas())
+    return pd.concat(frames, ignore_index=True)
+
+
+@timed()
+def load_product_reviews(offset, count, path=REVIEWS_PATH):
+    return read_review_ranges([(offset, count)], path=path)
+
+
+def review_titles(products, sep=" | ", path=REVIEWS_PATH):
+    # joined review titles for a handful of products (index = product_row,
+    # as in a frame loaded from PRODUCTS_PATH)
+    reviews = read_review_ranges(
+        zip(products["review_offset"], products["review_count"]),
+        columns=["product_row", "review_title"],
+        path=path,
+    )
+    if len(reviews) == 0:
+        return pd.Series(None, index=products.index, dtype=object)
+    titles = reviews.groupby("product_row")["review_title"].agg(lambda s: sep.join(s.dropna()))
+    return titles.reindex(products.index)
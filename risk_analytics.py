@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from add_nlp import risk_words
+from profiling import timed
+
+# Risk rollups for Review Intelligence.
+#
+# The pipeline counts, per product, how many of its reviews mention each
+# risk word (kw_<word> columns) and aggregates risk rate, mean sentiment and
+# keyword hits per main_category x segment_name into RISK_ROLLUP_PATH. The
+# page only reads that small table, so keyword drill-downs never touch review
+# text at request time.
+
+RISK_ROLLUP_PATH = "outputs/risk_rollup.parquet"
+KEYWORD_COLUMNS = [f"kw_{w}" for w in risk_words]
+ROLLUP_KEYS = ["main_category", "segment_name"]
+
+
+# ---------- Build (pipeline) ----------
+def add_keyword_counts(products, review_table, hits):
+    # hits: add_nlp.keyword_hits() of the review table, row-aligned with it
+    counts = hits.groupby(review_table["product_row"].to_numpy()).sum()
+    counts = counts.reindex(np.arange(len(products)), fill_value=0)
+    products = products.copy()
+    for w in risk_words:
+        products[f"kw_{w}"] = counts[w].to_numpy(dtype=np.int32)
+    return products
+
+
+@timed()
+def risk_rollup(df):
+    aggs = {
+        "products": ("product_id", "count"),
+        "risky_products": ("risk_flag", "sum"),
+        "risk_rate": ("risk_flag", "mean"),
+        "mean_sentiment": ("sentiment_score", "mean"),
+    }
+    for col in KEYWORD_COLUMNS:
+        if col in df.columns:
+            aggs[col] = (col, "sum")
+    return df.groupby(ROLLUP_KEYS, dropna=False).agg(**aggs).reset_index()
+
+
+def write_rollup(rollup, path=RISK_ROLLUP_PATH):
+    tmp = path + ".tmp"
+    rollup.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+# ---------- Queries (dashboard) ----------
+def load_rollup(path=RISK_ROLLUP_PATH):
+    return pd.read_parquet(path) if os.path.exists(path) else None
+
+
+def keywords_in(rollup):
+    return [c[len("kw_"):] for c in KEYWORD_COLUMNS if c in rollup.columns]
+
+
+def risk_matrix(rollup, value="risk_rate"):
+    # category x segment table of one rollup measure
+    if value in ("risk_rate", "mean_sentiment"):
+        # re-weight by product count so merged cells stay exact
+        weighted = rollup.assign(_w=rollup[value] * rollup["products"])
+        table = weighted.pivot_table(index="main_category", columns="segment_name", values=["_w", "products"], aggfunc="sum")
+        return table["_w"] / table["products"]
+    return rollup.pivot_table(index="main_category", columns="segment_name", values=value, aggfunc="sum")
+
+
+def keyword_drilldown(rollup, keywords, by="main_category"):
+    # review mentions of the given risk words per category (or segment), most first
+    cols = [f"kw_{k}" for k in keywords]
+    out = rollup.groupby(by)[cols + ["products"]].sum()
+    out.columns = [c[len("kw_"):] if c.startswith("kw_") else c for c in out.columns]
+    out["mentions"] = out[list(keywords)].sum(axis=1)
+    out["mentions_per_100_products"] = out["mentions"] / out["products"] * 100
+    return out.sort_values("mentions", ascending=False).reset_index()
+
+
+@timed()
+def top_risky(df, n=50):
+    # Risk-flagged rows with the lowest sentiment (then trust), like
+    # df[df.risk_flag == 1].sort_values([...]).head(n), but only the rows that
+    # can make the cut are copied and sorted: np.partition finds the n-th
+    # lowest sentiment, and everything at or below it goes to the final sort.
+    if n <= 0:
+        return df.iloc[:0]
+    pos = np.flatnonzero((df["risk_flag"] == 1).to_numpy())
+    sentiment = df["sentiment_score"].to_numpy(dtype=float)[pos]
+    valid = ~np.isnan(sentiment)
+    if valid.sum() > n:
+        kth = np.partition(sentiment[valid], n - 1)[n - 1]
+        pos = pos[sentiment <= kth]  # keeps ties at kth; NaN rows sort last so they never make it
+    return df.iloc[pos].sort_values(["sentiment_score", "trust_score"], ascending=True).head(n)
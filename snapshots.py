@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+from profiling import timed
+
+# Versioned dataset snapshots.
+#
+# Every writer of the scored products (pipeline.py, generate_data.py,
+# add_nlp.py) publishes what it wrote as a snapshot:
+#
+#   outputs/snapshots/20261019T101500123456Z/products.parquet
+#   outputs/snapshots/20261019T101500123456Z/reviews.parquet
+#   outputs/snapshots/20261019T101500123456Z/partitions/...   (partitioned_store.py)
+#   outputs/snapshots/20261019T101500123456Z/risk_rollup.parquet   (risk_analytics.py)
+#   outputs/snapshots/CURRENT.json        {"version": ..., "files": {...}}
+#
+# The files are hard links to the outputs just written (a copy where links
+# are not supported); a directory output is linked file by file. Outputs are always replaced with os.replace, never
+# rewritten in place, so a published snapshot never changes under a reader.
+# The snapshot directory is filled under a .tmp name and renamed, then
+# CURRENT.json is swapped in with os.replace. A reader sees either the
+# previous snapshot or the new one, never a half-written file. The KEEP
+# newest snapshots stay on disk, so a process still serving an older one
+# can finish reading its reviews.
+#
+# The dashboard (live_data.py) stats CURRENT.json to notice a new version.
+#
+#   python snapshots.py                # list snapshots, * marks the current one
+#   python snapshots.py --publish      # snapshot the current outputs
+
+SNAPSHOT_DIR = "outputs/snapshots"
+MANIFEST_PATH = os.path.join(SNAPSHOT_DIR, "CURRENT.json")
+KEEP = 3
+
+
+def _link(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _link_tree(src, dst):
+    for dirpath, _, filenames in os.walk(src):
+        target = os.path.join(dst, os.path.relpath(dirpath, src))
+        os.makedirs(target, exist_ok=True)
+        for name in filenames:
+            _link(os.path.join(dirpath, name), os.path.join(target, name))
+
+
+def replace_csv(df, path):
+    # write beside `path`, then swap it in: a snapshot linked to the old file keeps the old contents
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def product_files(products_path, columns):
+    # {"products", "reviews"} to publish: the review store goes along whenever
+    # the product rows point into it (review_offset / review_count)
+    from review_store import REVIEWS_PATH
+
+    reviews = REVIEWS_PATH if "review_offset" in columns and os.path.exists(REVIEWS_PATH) else None
+    return {"products": products_path, "reviews": reviews}
+
+
+@timed()
+def publish(files, root=SNAPSHOT_DIR):
+    # files: {"products": path, "reviews": path or None, "partitions": directory or None,
+    # "risk_rollup": path or None}; returns the new version
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    tmp = os.path.join(root, version + ".tmp")
+    os.makedirs(tmp)
+
+    names = {}
+    for role, src in files.items():
+        if src is None:
+            continue
+        # keep the extension, load_products picks the reader from it
+        if os.path.isdir(src):
+            names[role] = role
+            _link_tree(src, os.path.join(tmp, role))
+        else:
+            names[role] = role + os.path.splitext(src)[1]
+            _link(src, os.path.join(tmp, names[role]))
+    os.rename(tmp, os.path.join(root, version))
+
+    manifest = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "files": names,
+    }
+    path = os.path.join(root, "CURRENT.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+    prune(root)
+    return version
+
+
+def versions(root=SNAPSHOT_DIR):
+    # published versions, oldest first (names sort by time)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        d for d in os.listdir(root)
+        if not d.endswith(".tmp") and os.path.isdir(os.path.join(root, d))
+    )
+
+
+def prune(root=SNAPSHOT_DIR, keep=KEEP):
+    current = read_manifest(root)
+    for version in versions(root)[:-keep]:
+        if current is None or version != current["version"]:
+            shutil.rmtree(os.path.join(root, version), ignore_errors=True)
+    # directories left behind by a writer that died before its rename
+    for d in os.listdir(root):
+        if d.endswith(".tmp") and os.path.isdir(os.path.join(root, d)):
+            shutil.rmtree(os.path.join(root, d), ignore_errors=True)
+
+
+# ---------- Reads (dashboard) ----------
+def manifest_stamp(root=SNAPSHOT_DIR):
+    # changes whenever a new snapshot is published; one stat call
+    try:
+        stat = os.stat(os.path.join(root, "CURRENT.json"))
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_ino
+
+
+def read_manifest(root=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(root, "CURRENT.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def snapshot_path(manifest, role, root=SNAPSHOT_DIR):
+    name = manifest["files"].get(role)
+    return os.path.join(root, manifest["version"], name) if name else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or publish dataset snapshots")
+    parser.add_argument("--publish", action="store_true", help="snapshot the current outputs")
+    args = parser.parse_args()
+
+    if args.publish:
+        import partitioned_store
+        import risk_analytics
+        from intelligence import default_data_path, load_products
+        from review_store import PRODUCTS_PATH
+
+        products = default_data_path()
+        df = load_products(products)
+        if df is None:
+            raise SystemExit("No scored products found; run pipeline.py first.")
+        files = product_files(products, df.columns)
+        # the partitioned store and risk rollup go with the slim product file pipeline.py writes beside them
+        if products == PRODUCTS_PATH and partitioned_store.available():
+            files["partitions"] = partitioned_store.PARTITIONED_DIR
+        if products == PRODUCTS_PATH and os.path.exists(risk_analytics.RISK_ROLLUP_PATH):
+            files["risk_rollup"] = risk_analytics.RISK_ROLLUP_PATH
+        print(f"Published snapshot {publish(files)}")
+
+    current = read_manifest()
+    for version in versions():
+        mark = "*" if current is not None and version == current["version"] else " "
+        files = ", ".join(sorted(os.listdir(os.path.join(SNAPSHOT_DIR, version))))
+        print(f"{mark} {version}  {files}")
+
+
+if __name__ == "__main__":
+    main()
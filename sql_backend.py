@@ -0,0 +1,323 @@
+import argparse
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from intelligence import PREFERENCE_WEIGHTS, load_products, main_category
+from profiling import timed
+from review_store import slim_products
+
+# Optional SQLite backend for the dashboard.
+#
+# The pandas path loads the whole scored catalog into every Streamlit
+# process. With APP_BACKEND=sqlite the Explorer, Category Intelligence,
+# Recommendation Engine and Review Intelligence pages instead push their
+# filters, group-bys and top-N down to DB_PATH and only pull the rows they
+# show. Results match the pandas functions in intelligence.py.
+#
+#   python pipeline.py --db                    # or: python sql_backend.py
+#   APP_BACKEND=sqlite streamlit run app.py
+
+DB_PATH = "outputs/products.db"
+TABLE = "products"
+SUMMARY_TABLE = "category_summary"
+
+# main_category leads a composite index since the Explorer and the
+# Recommendation Engine always pair it with a price range; idx_rank serves
+# the trust / value ordering when no selective filter is set
+INDEXES = {
+    "idx_category_price": ["main_category", "discounted_price"],
+    "idx_segment": ["segment_name"],
+    "idx_price": ["discounted_price"],
+    "idx_product_id": ["product_id"],
+    "idx_rank": ["trust_score DESC", "value_score DESC"],
+}
+
+CATEGORY_SUMMARY_SQL = f"""
+    SELECT main_category,
+           COUNT(product_id) AS product_count,
+           AVG(discount_percentage) AS avg_discount,
+           AVG(rating) AS avg_rating,
+           AVG(value_score) AS avg_value,
+           AVG(trust_score) AS avg_trust,
+           AVG(popularity_score) AS avg_popularity
+    FROM {TABLE} NOT INDEXED
+    GROUP BY main_category
+    ORDER BY product_count DESC
+"""
+
+
+def enabled(path=DB_PATH):
+    return os.environ.get("APP_BACKEND", "").lower() == "sqlite" and os.path.exists(path)
+
+
+def _upper(value):
+    return value.upper() if isinstance(value, str) else value
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    # let repeated queries read pages straight from the OS page cache
+    conn.execute("PRAGMA mmap_size = 268435456")
+    # SQLite's upper() / lower() only fold ASCII; this folds like str.contains(case=False)
+    conn.create_function("py_upper", 1, _upper, deterministic=True)
+    return conn
+
+
+def query(sql, params=(), path=DB_PATH):
+    conn = connect(path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+# ---------- Build (pipeline) ----------
+@timed()
+def write_db(products, path=DB_PATH):
+    df = slim_products(products)
+    if "main_category" not in df.columns:
+        df["main_category"] = main_category(df["category"])
+
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        # rows go in product order, so rowid - 1 is the review store's product_row
+        df.to_sql(TABLE, conn, index=False, chunksize=50_000)
+        for name, cols in INDEXES.items():
+            if all(c.split()[0] in df.columns for c in cols):
+                conn.execute(f"CREATE INDEX {name} ON {TABLE} ({', '.join(cols)})")
+        # the category table only changes with the data, so it is aggregated once here
+        conn.execute(f"CREATE TABLE {SUMMARY_TABLE} AS {CATEGORY_SUMMARY_SQL}")
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+
+# ---------- Lookups for sidebar widgets ----------
+def columns(path=DB_PATH):
+    return query(f"PRAGMA table_info({TABLE})", path=path)["name"].tolist()
+
+
+def distinct_values(column, path=DB_PATH):
+    # served from the column's index
+    sql = f'SELECT DISTINCT "{column}" FROM {TABLE} WHERE "{column}" IS NOT NULL ORDER BY 1'
+    return query(sql, path=path)[column].tolist()
+
+
+def value_range(column, path=DB_PATH):
+    row = query(f'SELECT MIN("{column}") AS lo, MAX("{column}") AS hi FROM {TABLE}', path=path).iloc[0]
+    return float(row["lo"]), float(row["hi"])
+
+
+# ---------- Product Explorer ----------
+def where_clause(
+    search_query="",
+    category="All",
+    segment="All",
+    price_range=None,
+    discount_range=None,
+    rating_range=None,
+    only_risky=False,
+    only_mrp_outliers=False,
+):
+    # same conditions as intelligence.filter_products
+    clauses, params = [], []
+
+    if search_query and search_query.strip():
+        clauses.append("instr(py_upper(product_name), ?) > 0")
+        params.append(search_query.upper())
+
+    if category != "All":
+        clauses.append("main_category = ?")
+        params.append(category)
+
+    if segment != "All":
+        clauses.append("segment_name = ?")
+        params.append(segment)
+
+    for col, bounds in (
+        ("discounted_price", price_range),
+        ("discount_percentage", discount_range),
+        ("rating", rating_range),
+    ):
+        if bounds is not None:
+            clauses.append(f"{col} BETWEEN ? AND ?")
+            params.extend([float(bounds[0]), float(bounds[1])])
+
+    if only_risky:
+        clauses.append("risk_flag = 1")
+
+    if only_mrp_outliers:
+        clauses.append("mrp_outlier = 1")
+
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _collapsed(rows, rid, order):
+    # intelligence.collapse_listings: the first row of each listing group in
+    # `order`, plus the group's size, as a subquery over `rows`
+    return f"""(
+        SELECT * FROM (
+            SELECT *,
+                   ROW_NUMBER() OVER (PARTITION BY listing_group_id ORDER BY {order}, {rid}) AS listing_rank,
+                   COUNT(*) OVER (PARTITION BY listing_group_id) AS listing_count
+            FROM {rows}
+        ) WHERE listing_rank = 1
+    )"""
+
+
+def _source(where, collapse):
+    # (FROM target, rowid column) of the filtered rows
+    if not collapse:
+        return TABLE + where, "rowid"
+    rows = f"(SELECT rowid AS rid, * FROM {TABLE}{where})"
+    return _collapsed(rows, "rid", "trust_score DESC, value_score DESC"), "rid"
+
+
+@timed()
+def filter_summary(path=DB_PATH, collapse=False, **filters):
+    where, params = where_clause(**filters)
+    source, _ = _source(where, collapse)
+    sql = f"""
+        SELECT COUNT(*) AS products, AVG(rating) AS avg_rating,
+               AVG(discount_percentage) AS avg_discount, AVG(trust_score) AS avg_trust
+        FROM {source}
+    """
+    return query(sql, params, path).iloc[0].to_dict()
+
+
+@timed()
+def filter_products(cols=None, limit=None, path=DB_PATH, collapse=False, **filters):
+    # filtered rows in rank_products order (trust, then value, both descending);
+    # with collapse, only the best-ranked row of each near-duplicate group
+    where, params = where_clause(**filters)
+    source, rid = _source(where, collapse)
+    select = ", ".join(f'"{c}"' for c in cols) if cols else "*"
+    sql = f"SELECT {select} FROM {source} ORDER BY trust_score DESC, value_score DESC, {rid}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return query(sql, params, path).drop(columns=["rid", "listing_rank"], errors="ignore")
+
+
+# ---------- Category Intelligence ----------
+@timed()
+def category_summary(path=DB_PATH):
+    return query(f"SELECT * FROM {SUMMARY_TABLE} ORDER BY product_count DESC", path=path)
+
+
+# ---------- Recommendation Engine ----------
+def _normalized(col):
+    # intelligence.normalize, with the bounds taken over the filtered rows
+    lo, hi = f"b.{col}_lo", f"b.{col}_hi"
+    return f"CASE WHEN {hi} = {lo} THEN 0.5 ELSE (f.{col} - {lo}) / ({hi} - {lo}) END"
+
+
+@timed()
+def recommend(
+    category="All", max_budget=None, min_rating=0.0, preference="Best overall", top_n=15, collapse=False, path=DB_PATH
+):
+    clauses, params = ["rating >= ?"], [float(min_rating)]
+    if category != "All":
+        clauses.append("main_category = ?")
+        params.append(category)
+    if max_budget is not None:
+        clauses.append("discounted_price <= ?")
+        params.append(float(max_budget))
+
+    # score only the three component columns of the matching rows; full rows
+    # are fetched for the top_n winners
+    score_cols = ["value_score", "trust_score", "popularity_score"]
+    bounds = ", ".join(f"MIN({c}) AS {c}_lo, MAX({c}) AS {c}_hi" for c in score_cols)
+    group, f_group = (", listing_group_id", ", f.listing_group_id") if collapse else ("", "")
+    scored = _collapsed("s", "rid", "final_score DESC") if collapse else "s"
+    weights = PREFERENCE_WEIGHTS[preference]
+    sql = f"""
+        WITH f AS (
+            SELECT rowid AS rid, {", ".join(score_cols)}{group} FROM {TABLE}
+            WHERE {" AND ".join(clauses)}
+        ),
+        b AS (SELECT {bounds} FROM f),
+        n AS (
+            SELECT f.rid{f_group},
+                   {_normalized("value_score")} AS value_n,
+                   {_normalized("trust_score")} AS trust_n,
+                   {_normalized("popularity_score")} AS popularity_n
+            FROM f, b
+        ),
+        s AS (SELECT *, ? * trust_n + ? * value_n + ? * popularity_n AS final_score FROM n),
+        top AS (SELECT * FROM {scored} ORDER BY final_score DESC LIMIT ?)
+        SELECT p.*, top.value_n, top.trust_n, top.popularity_n, top.final_score{", top.listing_count" if collapse else ""}
+        FROM top JOIN {TABLE} p ON p.rowid = top.rid
+        ORDER BY top.final_score DESC
+    """
+    params += [weights["trust"], weights["value"], weights["popularity"], int(top_n)]
+    return query(sql, params, path)
+
+
+# ---------- Review Intelligence ----------
+@timed()
+def review_summary(path=DB_PATH):
+    sql = f"""
+        SELECT AVG(sentiment_score) AS avg_sentiment,
+               SUM(risk_flag) AS risk_count,
+               AVG(risk_flag) AS risk_rate
+        FROM {TABLE}
+    """
+    return query(sql, path=path).iloc[0].to_dict()
+
+
+@timed()
+def sentiment_histogram(bins=20, path=DB_PATH):
+    # (counts, edges) with the same equal-width bins as plt.hist(values, bins)
+    lo, hi = value_range("sentiment_score", path)
+    if hi == lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    sql = f"""
+        SELECT MIN(CAST((sentiment_score - ?) / ? AS INTEGER), ?) AS bin, COUNT(*) AS n
+        FROM {TABLE}
+        WHERE sentiment_score IS NOT NULL
+        GROUP BY bin
+    """
+    counts = query(sql, [lo, (hi - lo) / bins, bins - 1], path)
+    hist = np.zeros(bins, dtype=np.int64)
+    hist[counts["bin"].to_numpy(dtype=np.int64)] = counts["n"].to_numpy()
+    return hist, np.linspace(lo, hi, bins + 1)
+
+
+@timed()
+def top_risky(cols=None, n=50, path=DB_PATH):
+    # risk-flagged rows, lowest sentiment then lowest trust first (NULLs last, as in pandas);
+    # indexed by product_row like a frame loaded from PRODUCTS_PATH
+    select = ", ".join(f'"{c}"' for c in cols) if cols else "*"
+    sql = f"""
+        SELECT rowid - 1 AS product_row, {select} FROM {TABLE}
+        WHERE risk_flag = 1
+        ORDER BY sentiment_score IS NULL, sentiment_score, trust_score IS NULL, trust_score, rowid
+        LIMIT ?
+    """
+    return query(sql, [max(int(n), 0)], path).set_index("product_row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the SQLite dashboard backend from the scored products")
+    parser.add_argument("--source", default=None, help="scored CSV / products.parquet (default: newest output)")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    df = load_products(args.source)
+    if df is None:
+        raise SystemExit("No scored products found; run pipeline.py first.")
+    write_db(df, args.db)
+    print(f"Wrote {len(df):,} products to {args.db}")
+
+
+if __name__ == "__main__":
+    main()
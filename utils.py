@@ -1,3 +1,8 @@
+import streamlit as st
+import profiling
+import query_cache
+import live_data
+
 def segment_badge(segment):
     colors = {
         "Best Deals": "#16a34a",
@@ -44,3 +49,64 @@ def product_card(row):
         </div>
     </div>
     """
+
+def load_data(prefer_partitions=False):
+    # (df, version, reviews_path, partitions_path, risk_rollup_path) of the current snapshot, shared by all pages
+    # and sessions; newly published snapshots are swapped in by a background reload (live_data.py).
+    # prefer_partitions: pages that can read the partitioned store do not wait for the frame
+    # (df may be None) while the snapshot has one
+    data = live_data.DATASET.source() if prefer_partitions else None
+    if data is None or data.partitions_path is None:
+        data = live_data.DATASET.current()
+    seen = st.session_state.get("data_version")
+    if data.version is not None and seen is not None and seen != data.version:
+        st.toast(f"🔄 Data refreshed to snapshot {data.version}")
+    st.session_state["data_version"] = data.version
+    return data
+
+def timings_panel():
+    # Debug sidebar panel, only shown when APP_TIMINGS=1 (or APP_PROFILE) is set
+    if not profiling.enabled():
+        return
+    recs = profiling.records()
+    total = sum(r["seconds"] or 0 for r in recs if r["depth"] == 0)
+    with st.sidebar.expander(f"⏱️ Timings — {total * 1000:.0f} ms this rerun"):
+        st.code(profiling.format_records(recs) or "No spans recorded.", language=None)
+        c = query_cache.CACHE.stats()
+        hit_rate = f"{c['hit_rate']:.0%}" if c["hit_rate"] is not None else "—"
+        st.caption(
+            f"🗃️ Query cache: {c['entries']:,} results, {c['mb']:.1f} / {c['max_mb']:.0f} MB, "
+            f"hit rate {hit_rate} ({c['hits']:,} hits, {c['misses']:,} misses, {c['evictions']:,} evicted)"
+        )
+
+@st.cache_data
+def load_price_history(product_id, version):
+    # version: price_history.history_version(), so a new snapshot invalidates the cache
+    import price_history
+    return price_history.product_history(product_id)
+
+def price_trend(row):
+    # Price / rating history charts for one product; returns the history frame
+    # (price_history / pyarrow.dataset are imported only by the pages that chart it)
+    import price_history
+    history = load_price_history(str(row["product_id"]), price_history.history_version())
+    if len(history) < 2:
+        st.info("No price changes recorded yet — the trend fills in as the pipeline is re-run on fresh data.")
+        return history
+
+    trend = history.set_index("snapshot_at")
+    c1, c2 = st.columns(2)
+    with c1:
+        st.caption("Actual vs discounted price (₹)")
+        st.line_chart(trend[["actual_price", "discounted_price"]])
+    with c2:
+        st.caption("Rating")
+        st.line_chart(trend[["rating"]])
+
+    for _, e in price_history.inflated_before_discount(history).iterrows():
+        st.warning(
+            f"⚠️ Inflated MRP before discount: by {e['snapshot_at']:%d %b %Y} the actual price went from "
+            f"₹{e['baseline_actual']:.0f} to ₹{e['actual_price']:.0f} while the discounted price stayed at "
+            f"₹{e['discounted_price']:.0f} (was ₹{e['baseline_discounted']:.0f})."
+        )
+    return history